@@ -1,12 +1,26 @@
 import os
 import sys
-import shutil
 from pathlib import Path
 from dotenv import load_dotenv
 
 import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.mcp import MCPServer, MCPServerStdio
+from pydantic_ai.models import Model
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, ToolCallPart, UserPromptPart
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from bounded_sql import bounded, sql_toolset
+from manifest_index import manifest_toolset
+from memory import ConversationMemory
+from startup import prewarmed, resolve_dbt_mcp, startups
+from tool_cache import DATA_TOOLS, STATE_CHANGING_TOOLS, cached
+from tool_pruning import pruned
+from tracing import traced, tracer
+from storage import get_cached_answer, manifest_hash, put_cached_answer
 
 # Load env from ../.env
 ENV_FILE = Path(__file__).parent.parent / ".env"
@@ -34,68 +48,203 @@ def _build_mcp_stdio() -> MCPServerStdio:
     Prefer launching the dbt-mcp console script if available.
     Fallback to 'python -m dbt_mcp.main' when the console script isn't found.
     This avoids the closed-stdin issues seen when chaining through 'uvx' under Streamlit.
+
+    The lookup (DBT_MCP_BIN, the venv next to this Python, PATH, then the module)
+    is cached on disk by resolve_dbt_mcp, so reconnects don't probe again.
     """
-    # 1) Explicit binary set by user
-    if DBT_MCP_BIN and Path(DBT_MCP_BIN).exists():
-        print(f"[agent] launching dbt-mcp via DBT_MCP_BIN: {DBT_MCP_BIN}")
-        return MCPServerStdio(
-            command=DBT_MCP_BIN,
-            args=[],
-            env=MCP_ENV,
-            timeout=90,
-        )
-
-    # 2) Binary next to this Python (same venv): <venv>/bin/dbt-mcp
-    venv_dir = Path(sys.executable).parent
-    venv_dbt_mcp = venv_dir / ("dbt-mcp.exe" if os.name == "nt" else "dbt-mcp")
-    if venv_dbt_mcp.exists():
-        print(f"[agent] launching dbt-mcp via venv binary: {venv_dbt_mcp}")
-        return MCPServerStdio(
-            command=str(venv_dbt_mcp),
-            args=[],
-            env=MCP_ENV,
-            timeout=90,
-        )
-
-    # 3) Binary on PATH
-    which_dbt_mcp = shutil.which("dbt-mcp")
-    if which_dbt_mcp:
-        print(f"[agent] launching dbt-mcp via PATH: {which_dbt_mcp}")
-        return MCPServerStdio(
-            command=which_dbt_mcp,
-            args=[],
-            env=MCP_ENV,
-            timeout=90,
-        )
-
-    # 4) Fallback: module entrypoint
-    # NOTE: 'dbt_mcp' has no __main__, so use 'dbt_mcp.main'
-    print("[agent] launching dbt-mcp via module: python -m dbt_mcp.main")
+    command, args, how = resolve_dbt_mcp(DBT_MCP_BIN)
+    print(f"[agent] launching dbt-mcp via {how}: {' '.join([command, *args])}")
     return MCPServerStdio(
-        command=sys.executable,
-        args=["-m", "dbt_mcp.main"],
+        command=command,
+        args=args,
         env=MCP_ENV,
         timeout=90,
     )
 
 # ---------- Agent / MCP ----------
-def build_agent() -> Agent:
-    """Create a fresh Agent wired to a local dbt-mcp via stdio."""
-    dbt_server = _build_mcp_stdio()
+def build_agent(dbt_server: MCPServer | None = None, model: Model | str | None = None) -> Agent:
+    """Create a fresh Agent wired to a local dbt-mcp via stdio (or to `dbt_server`, e.g. a stub)."""
+    if dbt_server is None:
+        dbt_server = _build_mcp_stdio()
+    project_dir = MCP_ENV.get("DBT_PROJECT_DIR")
+    toolsets = [pruned(traced(bounded(cached(prewarmed(dbt_server), project_dir=project_dir))))]
+    if project_dir:
+        toolsets.append(traced(manifest_toolset(project_dir)))
+        if (sql_tools := sql_toolset(project_dir)) is not None:
+            toolsets.append(traced(sql_tools))
     return Agent(
-        model=MODEL_NAME,
-        toolsets=[dbt_server],
+        model=model or MODEL_NAME,
+        toolsets=toolsets,
         instructions=(
             "You are a helpful dbt assistant. "
             "Provide clear, concise answers about the dbt project. "
-            "When listing items, be organized and easy to read."
+            "When listing items, be organized and easy to read. "
+            "Prefer the manifest_* tools for lineage, dependency and column questions. "
+            "For questions about the data, aggregate in SQL rather than selecting raw rows."
         ),
     )
 
-def agent_ask(agent: Agent, user_text: str) -> str:
-    """Run one question/answer round synchronously for Streamlit."""
-    async def _run_once() -> str:
-        async with agent:
-            res = await agent.run(user_text)
-            return res.output
-    return asyncio.run(_run_once())
+# ---------- Long-lived session ----------
+# Seconds to wait for dbt-mcp to answer a tools/list before treating it as dead.
+HEALTH_CHECK_TIMEOUT = 10
+
+
+@dataclass
+class Reply:
+    text: str
+    tools: list[str] = field(default_factory=list)  # names of the tools the run called
+
+
+@dataclass
+class _Job:
+    user_text: str
+    memory: ConversationMemory | None = None
+    future: Future = field(default_factory=Future)
+    reconnects: int = 0
+
+
+class AgentSession:
+    """
+    One Agent and its dbt-mcp stdio session, kept alive on a background event loop.
+
+    Streamlit re-runs the script on every interaction, so starting dbt-mcp per
+    question (asyncio.run + `async with agent`) paid the subprocess start and
+    MCP handshake every time. Here a daemon thread runs an event loop with a
+    single owner task that enters the agent once and answers questions in
+    order; `submit` hands back a concurrent Future. The owner task is the only
+    one that enters and exits the MCP context, which anyio requires.
+
+    If a run fails and dbt-mcp no longer answers tools/list, the subprocess
+    is assumed dead: a fresh agent is built, reconnected, and the question is
+    retried once.
+    """
+
+    def __init__(self, agent_factory=build_agent):
+        self._agent_factory = agent_factory
+        self._loop = asyncio.new_event_loop()
+        self._jobs: asyncio.Queue | None = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="dbt-mcp-session", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._jobs = asyncio.Queue()
+        self._loop.create_task(self._serve())
+        self._started.set()
+        self._loop.run_forever()
+
+    def submit(self, user_text: str, memory: ConversationMemory | None = None) -> Future:
+        """Queue a question, optionally as a follow-up in `memory`; the Future resolves to a Reply."""
+        job = _Job(user_text, memory)
+        self._loop.call_soon_threadsafe(self._jobs.put_nowait, job)
+        return job.future
+
+    async def _serve(self) -> None:
+        job = None
+        while True:
+            job = job or await self._jobs.get()
+            agent = self._agent_factory()
+            try:
+                async with agent:
+                    while True:
+                        await self._answer(agent, job)
+                        job = await self._jobs.get()
+            except Exception as e:
+                print(f"[agent] dbt-mcp session lost ({e!r}); reconnecting")
+                if job.reconnects >= 1:
+                    job.future.set_exception(e)
+                    job = None
+                else:
+                    job.reconnects += 1
+
+    async def _answer(self, agent: Agent, job: _Job) -> None:
+        try:
+            with tracer().turn(job.user_text) as turn:
+                history = job.memory.history() if job.memory is not None else None
+                res = await agent.run(job.user_text, message_history=history)
+                turn.done(res)
+        except Exception as e:
+            if not await _session_alive(agent):
+                raise
+            job.future.set_exception(e)
+        else:
+            if job.memory is not None:
+                job.memory.add(res.new_messages())
+            tools = [
+                p.tool_name for m in res.new_messages() if isinstance(m, ModelResponse)
+                for p in m.parts if isinstance(p, ToolCallPart)
+            ]
+            job.future.set_result(Reply(res.output, tools))
+
+
+async def _session_alive(agent: Agent) -> bool:
+    """True when every MCP server behind the agent started and still answers tools/list."""
+    # A prewarmed server that failed to start isn't running; listing its tools would start it here instead
+    if any(startup.error is not None for startup in startups(agent.toolsets)):
+        return False
+    servers: list[MCPServer] = []
+    for toolset in agent.toolsets:
+        toolset.apply(lambda t: servers.append(t) if isinstance(t, MCPServer) else None)
+    try:
+        for server in servers:
+            await asyncio.wait_for(server.list_tools(), HEALTH_CHECK_TIMEOUT)
+    except Exception:
+        return False
+    return True
+
+
+def _text_turn(question: str, answer: str) -> list:
+    return [
+        ModelRequest(parts=[UserPromptPart(question)]),
+        ModelResponse(parts=[TextPart(answer)], model_name=MODEL_NAME),
+    ]
+
+
+def memory_from_messages(messages) -> ConversationMemory:
+    """
+    Rebuild a chat's memory from its stored (id, role, content, created_at)
+    rows, so follow-ups in a chat opened after a restart keep their context.
+    Only the question and answer text of each turn is stored, not tool calls.
+    """
+    memory = ConversationMemory()
+    question = None
+    for _, role, content, _ in messages:
+        if role == "user":
+            question = content
+        elif question is not None:
+            memory.add(_text_turn(question, content))
+            question = None
+    return memory
+
+
+def agent_ask(
+    session: AgentSession,
+    user_text: str,
+    memory: ConversationMemory | None = None,
+    conn=None,
+) -> str:
+    """
+    Run one question/answer round synchronously for Streamlit, continuing the conversation in `memory`.
+
+    With a storage connection, the opening question of a conversation is looked
+    up in the answer cache first (keyed on the question, the manifest and the
+    model), and a hit skips the LLM and dbt-mcp entirely. Without a
+    DBT_PROJECT_DIR manifest to key on, nothing is cached. Follow-ups depend on
+    earlier turns and are never cached, nor are answers from runs that changed
+    state or read warehouse data (build, run, show, run_sql, ...).
+    """
+    manifest = manifest_hash(MCP_ENV.get("DBT_PROJECT_DIR")) if conn is not None and not memory else None
+    cacheable = manifest is not None
+    if cacheable:
+        answer = get_cached_answer(conn, user_text, manifest, MODEL_NAME)
+        if answer is not None:
+            if memory is not None:
+                memory.add(_text_turn(user_text, answer))
+            return answer
+
+    reply = session.submit(user_text, memory).result()
+    if cacheable and not (STATE_CHANGING_TOOLS | DATA_TOOLS).intersection(reply.tools):
+        put_cached_answer(conn, user_text, manifest, MODEL_NAME, reply.text)
+    return reply.text
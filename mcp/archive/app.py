@@ -1,11 +1,28 @@
 import streamlit as st
-from agent import build_agent, agent_ask
-from storage import get_conn, create_chat, list_chats, get_chat_messages, add_message
+from agent import AgentSession, agent_ask, memory_from_messages
+from storage import (
+    get_conn, create_chat, list_chats, get_chat_messages, get_chat_messages_from, add_message,
+    search_messages, flush, answer_cache_stats,
+)
+
+
+@st.cache_resource
+def get_agent_session() -> AgentSession:
+    """One dbt-mcp session for the whole Streamlit process, reused across reruns."""
+    return AgentSession()
+
 
 if "chat_id" not in st.session_state:
     st.session_state.chat_id = None
-if "agent" not in st.session_state:
-    st.session_state.agent = build_agent()
+if "memories" not in st.session_state:
+    # Per-chat conversation memory handed to the agent with each question
+    st.session_state.memories = {}
+if "history_from" not in st.session_state:
+    # Per-chat id of the oldest message shown; absent means just the latest page
+    st.session_state.history_from = {}
+if "chats_before" not in st.session_state:
+    # Keyset cursor for the sidebar chat list; None shows the newest chats
+    st.session_state.chats_before = None
 
 conn = get_conn()
 
@@ -38,11 +55,28 @@ with st.sidebar:
     if st.button("➕ New chat", type="primary", use_container_width=True):
         st.session_state.chat_id = create_chat(conn, title="New chat")
 
-    # st.subheader("Chat history")
-    # for cid, title, created in list_chats(conn):
-    #     label = f"#{cid} — {title or 'Untitled'}"
-    #     if st.button(label, key=f"chat_{cid}", use_container_width=True):
-    #         st.session_state.chat_id = cid
+    st.subheader("Chat history")
+    chats = list_chats(conn, before_id=st.session_state.chats_before)
+    for cid, title, created in chats:
+        label = f"#{cid} — {title or 'Untitled'}"
+        if st.button(label, key=f"chat_{cid}", use_container_width=True):
+            st.session_state.chat_id = cid
+    cols = st.columns(2)
+    if st.session_state.chats_before is not None and cols[0].button("Newest", use_container_width=True):
+        st.session_state.chats_before = None
+        st.rerun()
+    if chats and list_chats(conn, before_id=chats[-1][0], limit=1) and cols[1].button("Older", use_container_width=True):
+        st.session_state.chats_before = chats[-1][0]
+        st.rerun()
+
+    query = st.text_input("Search past answers")
+    if query:
+        for cid, mid, snippet, created in search_messages(conn, query):
+            if st.button(f"#{cid}: {snippet}", key=f"hit_{mid}", use_container_width=True):
+                st.session_state.chat_id = cid
+
+    stats = answer_cache_stats(conn)
+    st.caption(f"Answer cache: {stats['hits']} hits / {stats['misses']} misses, {stats['entries']} stored")
 
 # ---------- Main Area ----------
 st.title("dbt MCP Chat")
@@ -61,8 +95,17 @@ else:
             st.success("Title saved")
 
     st.divider()
-    # Render history
-    for role, content, ts in get_chat_messages(conn, st.session_state.chat_id):
+    # Render history: the latest page, or everything from where "Load earlier" reached
+    cid = st.session_state.chat_id
+    if cid in st.session_state.history_from:
+        history = get_chat_messages_from(conn, cid, st.session_state.history_from[cid])
+    else:
+        history = get_chat_messages(conn, cid)
+    if history and get_chat_messages(conn, cid, before_id=history[0][0], limit=1):
+        if st.button("Load earlier messages"):
+            st.session_state.history_from[cid] = get_chat_messages(conn, cid, before_id=history[0][0])[0][0]
+            st.rerun()
+    for mid, role, content, ts in history:
         with st.chat_message("user" if role == "user" else "assistant"):
             st.markdown(content)
 
@@ -78,6 +121,12 @@ if user_text:
     if not st.session_state.chat_id:
         st.session_state.chat_id = create_chat(conn, title="New chat")
 
+    # Remember the chat's earlier turns, also when it was opened after a restart
+    if st.session_state.chat_id not in st.session_state.memories:
+        st.session_state.memories[st.session_state.chat_id] = memory_from_messages(
+            get_chat_messages(conn, st.session_state.chat_id)
+        )
+
     # Store user message & echo
     add_message(conn, st.session_state.chat_id, "user", user_text)
     with st.chat_message("user"):
@@ -85,10 +134,12 @@ if user_text:
 
     # Get assistant reply
     try:
-        reply = agent_ask(st.session_state.agent, user_text)
+        memory = st.session_state.memories[st.session_state.chat_id]
+        reply = agent_ask(get_agent_session(), user_text, memory, conn)
     except Exception as e:
         reply = f"Sorry, I hit an error while calling dbt MCP:\n\n```\n{e}\n```"
 
     add_message(conn, st.session_state.chat_id, "assistant", reply)
+    flush(conn)  # one commit per turn
     with st.chat_message("assistant"):
         st.markdown(reply)
\ No newline at end of file
@@ -1,12 +1,37 @@
+import atexit
+import hashlib
+import os
+import re
 import sqlite3
+import threading
+import time
 import streamlit as st
 from datetime import datetime
-from typing import List, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Chat history paging
+HISTORY_PAGE_SIZE = int(os.getenv("DBT_MCP_HISTORY_PAGE_SIZE", 50))
+CHAT_LIST_PAGE_SIZE = int(os.getenv("DBT_MCP_CHAT_LIST_PAGE_SIZE", 20))
+
+# Writes are committed together once this many are pending or the oldest is this old
+WRITE_BATCH_SIZE = int(os.getenv("DBT_MCP_WRITE_BATCH_SIZE", 32))
+WRITE_BATCH_SECONDS = float(os.getenv("DBT_MCP_WRITE_BATCH_SECONDS", 1.0))
+
+_MAX_ROWID = 2**63 - 1
+
+# Answer cache limits
+ANSWER_CACHE_TTL = float(os.getenv("DBT_MCP_ANSWER_CACHE_TTL", 24 * 3600))
+ANSWER_CACHE_SIZE = int(os.getenv("DBT_MCP_ANSWER_CACHE_SIZE", 1000))
 
 # ---------- SQLite helpers ----------
 @st.cache_resource
 def get_conn() -> sqlite3.Connection:
     conn = sqlite3.connect("chat_history.db", check_same_thread=False)
+    # WAL lets readers run alongside the writer; NORMAL sync is durable across app crashes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS chats (
@@ -28,30 +53,270 @@ def get_conn() -> sqlite3.Connection:
         )
         """
     )
+    # History pages are read per chat in id order
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_chat_id ON messages (chat_id, id)")
+    _create_search_index(conn)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS answer_cache (
+            key TEXT PRIMARY KEY,           -- sha256 of normalized question + manifest hash + model
+            question TEXT NOT NULL,
+            model TEXT NOT NULL,
+            manifest_hash TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_last_used ON answer_cache (last_used_at)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS answer_cache_stats (
+            name TEXT PRIMARY KEY,          -- 'hits' | 'misses'
+            value INTEGER NOT NULL
+        )
+        """
+    )
     conn.commit()
+    atexit.register(flush, conn)
     return conn
 
+def _create_search_index(conn: sqlite3.Connection) -> None:
+    """Full-text index over message content, kept in sync by triggers. Skipped if SQLite lacks FTS5."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'").fetchone()
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts "
+            "USING fts5(content, content='messages', content_rowid='id')"
+        )
+    except sqlite3.OperationalError:
+        return
+    conn.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+        END;
+        CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+        """
+    )
+    if not exists:
+        # Index messages written before the search index existed
+        conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+def _has_search_index(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'").fetchone() is not None
+
+# ---------- Batched writes ----------
+class _WriteBatch:
+    """Commit pending writes together instead of once per statement."""
+
+    def __init__(self, size: int = WRITE_BATCH_SIZE, seconds: float = WRITE_BATCH_SECONDS):
+        self.size = size
+        self.seconds = seconds
+        self.lock = threading.RLock()
+        self.pending = 0
+        self.oldest = 0.0
+
+    def wrote(self, conn: sqlite3.Connection) -> None:
+        if self.pending == 0:
+            self.oldest = time.monotonic()
+        self.pending += 1
+        if self.pending >= self.size or time.monotonic() - self.oldest >= self.seconds:
+            self.flush(conn)
+
+    def flush(self, conn: sqlite3.Connection) -> None:
+        with self.lock:
+            if self.pending:
+                conn.commit()
+                self.pending = 0
+
+_writes = _WriteBatch()
+
+def flush(conn: sqlite3.Connection) -> None:
+    """Commit any batched writes now, e.g. at the end of a chat turn."""
+    _writes.flush(conn)
+
+# ---------- Chats and messages ----------
 def create_chat(conn: sqlite3.Connection, title: str) -> int:
     ts = datetime.utcnow().isoformat()
-    cur = conn.execute("INSERT INTO chats (title, created_at) VALUES (?, ?)", (title, ts))
-    conn.commit()
+    with _writes.lock:
+        cur = conn.execute("INSERT INTO chats (title, created_at) VALUES (?, ?)", (title, ts))
+        _writes.pending += 1
+        _writes.flush(conn)
     return cur.lastrowid
 
-def list_chats(conn: sqlite3.Connection) -> List[Tuple[int, str, str]]:
-    cur = conn.execute("SELECT id, title, created_at FROM chats ORDER BY id DESC")
+def list_chats(
+    conn: sqlite3.Connection, before_id: Optional[int] = None, limit: int = CHAT_LIST_PAGE_SIZE
+) -> List[Tuple[int, str, str]]:
+    """The newest `limit` chats, or the page before chat `before_id` when paging back."""
+    cur = conn.execute(
+        "SELECT id, title, created_at FROM chats WHERE id < ? ORDER BY id DESC LIMIT ?",
+        (before_id if before_id is not None else _MAX_ROWID, limit),
+    )
     return cur.fetchall()
 
-def get_chat_messages(conn: sqlite3.Connection, chat_id: int) -> List[Tuple[str, str, str]]:
+def get_chat_messages(
+    conn: sqlite3.Connection,
+    chat_id: int,
+    before_id: Optional[int] = None,
+    limit: int = HISTORY_PAGE_SIZE,
+) -> List[Tuple[int, str, str, str]]:
+    """
+    One page of a chat as (id, role, content, created_at), oldest first.
+
+    Returns the latest `limit` messages, or those just before message
+    `before_id`; pass the first id of a page to get the one before it.
+    """
+    cur = conn.execute(
+        """
+        SELECT id, role, content, created_at FROM messages
+        WHERE chat_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+        """,
+        (chat_id, before_id if before_id is not None else _MAX_ROWID, limit),
+    )
+    return cur.fetchall()[::-1]
+
+def get_chat_messages_from(
+    conn: sqlite3.Connection, chat_id: int, from_id: int
+) -> List[Tuple[int, str, str, str]]:
+    """Messages of a chat from message `from_id` onwards, oldest first."""
     cur = conn.execute(
-        "SELECT role, content, created_at FROM messages WHERE chat_id = ? ORDER BY id ASC",
-        (chat_id,),
+        "SELECT id, role, content, created_at FROM messages WHERE chat_id = ? AND id >= ? ORDER BY id",
+        (chat_id, from_id),
     )
     return cur.fetchall()
 
 def add_message(conn: sqlite3.Connection, chat_id: int, role: str, content: str) -> None:
     ts = datetime.utcnow().isoformat()
+    with _writes.lock:
+        conn.execute(
+            "INSERT INTO messages (chat_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            (chat_id, role, content, ts),
+        )
+        _writes.wrote(conn)
+
+def search_messages(
+    conn: sqlite3.Connection, query: str, role: Optional[str] = "assistant", limit: int = 20
+) -> List[Tuple[int, int, str, str]]:
+    """Best matches for `query` as (chat_id, message_id, snippet, created_at); past answers by default."""
+    terms = " ".join('"' + t.replace('"', '""') + '"' for t in query.split())
+    if not terms:
+        return []
+    if not _has_search_index(conn):
+        # No FTS5 in this SQLite build: fall back to a substring scan
+        cur = conn.execute(
+            """
+            SELECT chat_id, id, substr(content, 1, 160), created_at FROM messages
+            WHERE content LIKE ? AND (? IS NULL OR role = ?) ORDER BY id DESC LIMIT ?
+            """,
+            (f"%{query.strip()}%", role, role, limit),
+        )
+        return cur.fetchall()
+    cur = conn.execute(
+        """
+        SELECT m.chat_id, m.id, snippet(messages_fts, 0, '**', '**', '…', 16), m.created_at
+        FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid
+        WHERE messages_fts MATCH ? AND (? IS NULL OR m.role = ?)
+        ORDER BY rank LIMIT ?
+        """,
+        (terms, role, role, limit),
+    )
+    return cur.fetchall()
+
+
+# ---------- Answer cache ----------
+# Repeated questions against an unchanged project are answered from here,
+# skipping the LLM and dbt-mcp entirely.
+_manifest_hashes: dict = {}
+
+def normalize_question(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?.! ")
+
+def manifest_hash(project_dir: Optional[str]) -> Optional[str]:
+    """
+    sha256 of target/manifest.json, re-hashed only when its mtime or size
+    changes; None without a manifest, when answers can't be cached.
+    """
+    if not project_dir:
+        return None
+    path = Path(project_dir) / "target" / "manifest.json"
+    try:
+        st_ = path.stat()
+    except OSError:
+        return None
+    stamp = (st_.st_mtime_ns, st_.st_size)
+    cached = _manifest_hashes.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, hashlib.sha256(path.read_bytes()).hexdigest())
+        _manifest_hashes[path] = cached
+    return cached[1]
+
+def answer_cache_key(question: str, manifest: str, model: str) -> str:
+    return hashlib.sha256(f"{normalize_question(question)}\0{manifest}\0{model}".encode()).hexdigest()
+
+def _bump_stat(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute(
+        "INSERT INTO answer_cache_stats (name, value) VALUES (?, 1) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+        (name,),
+    )
+
+def get_cached_answer(
+    conn: sqlite3.Connection, question: str, manifest: str, model: str, ttl: float = ANSWER_CACHE_TTL
+) -> Optional[str]:
+    key = answer_cache_key(question, manifest, model)
+    now = time.time()
+    row = conn.execute(
+        "SELECT answer FROM answer_cache WHERE key = ? AND created_at > ?", (key, now - ttl)
+    ).fetchone()
+    with _writes.lock:
+        if row is None:
+            _bump_stat(conn, "misses")
+        else:
+            conn.execute("UPDATE answer_cache SET hits = hits + 1, last_used_at = ? WHERE key = ?", (now, key))
+            _bump_stat(conn, "hits")
+        _writes.wrote(conn)
+    return row[0] if row else None
+
+def put_cached_answer(
+    conn: sqlite3.Connection,
+    question: str,
+    manifest: str,
+    model: str,
+    answer: str,
+    ttl: float = ANSWER_CACHE_TTL,
+    max_entries: int = ANSWER_CACHE_SIZE,
+) -> None:
+    """Store an answer, then evict expired entries and the least recently used beyond `max_entries`."""
+    now = time.time()
+    with _writes.lock:
+        _store_answer(conn, question, manifest, model, answer, now, ttl, max_entries)
+        _writes.wrote(conn)
+
+def _store_answer(conn, question, manifest, model, answer, now, ttl, max_entries) -> None:
     conn.execute(
-        "INSERT INTO messages (chat_id, role, content, created_at) VALUES (?, ?, ?, ?)",
-        (chat_id, role, content, ts),
+        """
+        INSERT OR REPLACE INTO answer_cache (key, question, model, manifest_hash, answer, created_at, last_used_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (answer_cache_key(question, manifest, model), normalize_question(question), model, manifest, answer, now, now),
     )
-    conn.commit()
\ No newline at end of file
+    conn.execute("DELETE FROM answer_cache WHERE created_at <= ?", (now - ttl,))
+    conn.execute(
+        """
+        DELETE FROM answer_cache WHERE key IN (
+            SELECT key FROM answer_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (max_entries,),
+    )
+
+def answer_cache_stats(conn: sqlite3.Connection) -> dict:
+    stats = dict(conn.execute("SELECT name, value FROM answer_cache_stats").fetchall())
+    entries = conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0]
+    return {"hits": stats.get("hits", 0), "misses": stats.get("misses", 0), "entries": entries}
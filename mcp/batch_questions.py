@@ -0,0 +1,181 @@
+"""
+Non-interactive batch mode for the dbt assistant.
+
+Reads questions as JSONL from a file or stdin and answers them concurrently
+with a pool of agents, each holding its own dbt-mcp session (a separate
+stdio subprocess for the local core setup, a separate HTTP session for the
+remote one). Results are written as JSONL in completion order, one line per
+question, with an `index` to restore input order.
+
+Each input line is either a JSON string or an object with a "question"
+field; any other fields (e.g. an "id" or an expected answer) are copied to
+the output untouched.
+
+    python batch_questions.py prompts.jsonl --workers 4 --output answers.jsonl
+    cat prompts.jsonl | python batch_questions.py - --remote > answers.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, TextIO
+
+from pydantic_ai import Agent
+
+from tracing import tracer
+
+
+def read_questions(stream: TextIO) -> list[dict]:
+    questions = []
+    for lineno, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            record = {"question": record}
+        if not isinstance(record, dict) or not record.get("question"):
+            raise ValueError(f"line {lineno}: expected a JSON string or an object with a 'question' field")
+        questions.append(record)
+    return questions
+
+
+async def _worker(
+    worker_id: int,
+    agent_factory: Callable[[], Agent],
+    jobs: asyncio.Queue,
+    results: asyncio.Queue,
+    timeout: float | None,
+) -> None:
+    """Answer questions from `jobs` over one agent and its MCP session until the queue is drained."""
+    agent = agent_factory()
+    async with agent:
+        while True:
+            try:
+                index, record = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            result = {**record, "index": index, "worker": worker_id,
+                      "started_at": datetime.now(timezone.utc).isoformat()}
+            try:
+                with tracer().turn(record["question"]) as turn:
+                    run = await asyncio.wait_for(agent.run(record["question"]), timeout)
+                    turn.done(run)
+                result["answer"] = run.output
+                usage = run.usage()
+                result["usage"] = {"requests": usage.requests, "input_tokens": usage.request_tokens,
+                                   "output_tokens": usage.response_tokens}
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            await results.put(result)
+
+
+async def run_batch(
+    questions: list[dict],
+    agent_factory: Callable[[], Agent],
+    output: TextIO,
+    workers: int = 4,
+    timeout: float | None = None,
+) -> list[dict]:
+    """Answer `questions` with up to `workers` concurrent agents, streaming JSONL results to `output`."""
+    if not questions:
+        # Nothing to answer: don't start a worker (and its MCP server) just to stop it again
+        return []
+    jobs: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(questions):
+        jobs.put_nowait(item)
+    results: asyncio.Queue = asyncio.Queue()
+
+    pool = [
+        asyncio.create_task(_worker(i, agent_factory, jobs, results, timeout))
+        for i in range(max(1, min(workers, len(questions))))
+    ]
+    running = set(pool)
+    done = []
+    while len(done) < len(questions):
+        getter = asyncio.create_task(results.get())
+        finished, _ = await asyncio.wait([getter, *running], return_when=asyncio.FIRST_COMPLETED)
+        running -= finished
+        if not getter.done():
+            getter.cancel()
+            if not running:
+                # Every worker exited (usually dbt-mcp failed to start); nothing left to answer with.
+                errors = [t.exception() for t in pool if t.exception()]
+                if errors:
+                    raise errors[0]
+                break
+            continue
+        result = getter.result()
+        done.append(result)
+        output.write(json.dumps(result, default=str) + "\n")
+        output.flush()
+    await asyncio.gather(*pool, return_exceptions=True)
+    return done
+
+
+def summarize(results: list[dict], wall_seconds: float) -> str:
+    seconds = sorted(r["seconds"] for r in results)
+    failed = sum(1 for r in results if "error" in r)
+    if len(seconds) >= 2:
+        cuts = statistics.quantiles(seconds, n=100, method="inclusive")
+        p50, p95 = cuts[49], cuts[94]
+    else:
+        p50 = p95 = seconds[0] if seconds else 0.0
+    return (
+        f"✓ {len(results) - failed} answered, {failed} failed in {wall_seconds:.1f}s "
+        f"(per question p50 {p50:.1f}s, p95 {p95:.1f}s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with a pool of dbt-mcp sessions.")
+    parser.add_argument("input", help="JSONL file of questions, or '-' for stdin")
+    parser.add_argument("--output", default="-", help="Where to write JSONL results (default: stdout)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent agents / dbt-mcp sessions (default: 4)")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-question timeout in seconds")
+    parser.add_argument(
+        "--remote", action="store_true",
+        help="Use the hosted dbt MCP server (.env.starter) instead of a local dbt-mcp subprocess",
+    )
+    args = parser.parse_args()
+
+    if args.remote:
+        from http_pool import build_http_client
+        from remote_mcp_local_client_starter_cli import build_agent, load_remote_config
+        # Keep the config printout out of the JSONL written to stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            config = load_remote_config()
+        if config is None:
+            sys.exit(1)
+        # All workers share one connection pool
+        http_client = build_http_client(config[1])
+        agent_factory = lambda: build_agent(*config, http_client)
+    else:
+        from local_mcp_local_client_core_cli import build_agent
+        agent_factory = build_agent
+
+    if args.input == "-":
+        questions = read_questions(sys.stdin)
+    else:
+        with open(args.input) as f:
+            questions = read_questions(f)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_batch(questions, agent_factory, output, args.workers, args.timeout))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(summarize(results, time.perf_counter() - started), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
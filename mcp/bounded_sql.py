@@ -0,0 +1,609 @@
+"""
+Bounded SQL for agent-issued queries.
+
+A careless "show me transactions" used to scan the whole of int_transactions
+and hand every row to the model, costing seconds of warehouse time and most
+of the context window. Queries now go through a layer that keeps them small:
+
+    toolsets = [pruned(traced(bounded(cached(dbt_server))))]   # dbt-mcp's show / execute_sql
+    toolsets.append(sql_toolset(project_dir))                  # run_sql, straight to the warehouse
+
+run_sql connects to the dbt target (DuckDB for `local`, Postgres otherwise)
+read-only, accepts exactly one SELECT statement, wraps it in a server-side
+LIMIT, cancels it once a deadline for the whole query passes and fetches
+rows in batches. DuckDB is opened without external access, so views over
+raw files can't be read through it. Up to DBT_MCP_SQL_INLINE_ROWS
+rows come back verbatim; larger results come back as a row count, per-column
+stats and the first few rows, accumulated batch by batch so the full result
+is never held in memory.
+
+Aggregate queries that an out_* model already answers (daily totals, daily
+totals by store, totals by product) are rewritten to read the model instead
+of scanning int_transactions. The out_* models only keep the dates in
+int_dates, so the model can ask for `exact` to query the base tables.
+
+bounded() applies the same limits to the dbt-mcp SQL tools: their row limit
+is clamped, the aggregate rewrite is applied and oversized results are
+summarized. dbt-mcp runs those queries itself, so no timeout is set for them.
+
+Knobs: DBT_MCP_SQL_MAX_ROWS (1000), DBT_MCP_SQL_TIMEOUT (15 seconds),
+DBT_MCP_SQL_BATCH_ROWS (500), DBT_MCP_SQL_INLINE_ROWS (50),
+DBT_MCP_SQL_SAMPLE_ROWS (10), DBT_MCP_SQL_TARGET (the dbt target to query;
+default `local` when DBT_DUCKDB_PATH is set, else `dev` when
+DBT_POSTGRES_HOST is). DBT_MCP_SQL_REWRITE=0 turns the rewrite off and
+DBT_MCP_SQL_LIMITS=0 turns all of this off.
+"""
+
+import datetime
+import decimal
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai import ModelRetry, RunContext
+from pydantic_ai.toolsets import AbstractToolset, FunctionToolset, WrapperToolset
+from pydantic_ai.toolsets.abstract import ToolsetTool
+
+from manifest_index import ManifestIndex
+
+SQL_MAX_ROWS = int(os.getenv("DBT_MCP_SQL_MAX_ROWS", 1000))
+SQL_TIMEOUT = float(os.getenv("DBT_MCP_SQL_TIMEOUT", 15))
+SQL_BATCH_ROWS = int(os.getenv("DBT_MCP_SQL_BATCH_ROWS", 500))
+SQL_INLINE_ROWS = int(os.getenv("DBT_MCP_SQL_INLINE_ROWS", 50))
+SQL_SAMPLE_ROWS = int(os.getenv("DBT_MCP_SQL_SAMPLE_ROWS", 10))
+
+# Distinct values tracked per column before reporting "N+"
+DISTINCT_CAP = 1000
+
+# dbt-mcp tools that run SQL
+SQL_TOOLS = frozenset({"show", "execute_sql"})
+
+
+# ---------- Aggregate rewrite ----------
+@dataclass(frozen=True)
+class Rollup:
+    """An out_* model answering GROUP BY `dims` over a base model, with base aggregate -> rollup expression."""
+
+    model: str
+    dims: frozenset
+    measures: dict
+    dated: bool = True
+
+
+_DAY = "day"
+# Canonical spellings (see _canonical) of the day of a transaction
+_DAY_EXPRESSIONS = {
+    "int_transactions": {
+        "date_trunc('day',transaction_date)", "date_trunc('day',transaction_date)::date", "date(transaction_date)",
+        "transaction_date::date", "cast(transaction_date as date)",
+    },
+    "int_daily_sales": {"date", "date::date", "date(date)", "cast(date as date)", "date_trunc('day',date)"},
+}
+_DIMENSIONS = {"store_name": "store_name", "product_name": "product_name"}
+# Base aggregates, per base model, and the rollup column they become
+_AGGREGATES = {
+    "int_transactions": {
+        "sum(amount)": "total_amount",
+        "count(distinct customer_id)": "total_customers",
+        "count(distinct product_id)": "total_products",
+        "count(distinct store_id)": "total_stores",
+    },
+    "int_daily_sales": {
+        "sum(total_amount)": "total_amount",
+        "count(distinct product_id)": "total_products",
+        "count(distinct store_id)": "total_stores",
+    },
+}
+ROLLUPS = (
+    Rollup("out_daily_summary", frozenset({_DAY}),
+           {c: c for c in ("total_amount", "total_customers", "total_products", "total_stores")}),
+    Rollup("out_daily_summary_by_store", frozenset({_DAY, "store_name"}),
+           {c: c for c in ("total_amount", "total_customers", "total_products")}),
+    Rollup("out_product_summary", frozenset({"product_name"}), {"total_amount": "total_amount"}, dated=False),
+    Rollup("out_product_summary", frozenset(), {"total_amount": "sum(total_amount)"}, dated=False),
+)
+
+_STATEMENT = re.compile(
+    r"^select (?P<select>.+?) from (?P<table>[\w.\"]+)(?: (?:as )?(?P<alias>(?!where\b|group\b|order\b|limit\b)\w+))?"
+    r"(?: where (?P<where>.+?))?(?: group by (?P<group>.+?))?(?: order by (?P<order>.+?))?(?: limit (?P<limit>\d+))?$",
+)
+_ALIAS = re.compile(r"^(?P<expr>.+?)(?: as)? (?P<alias>[a-z_]\w*|\"[^\"]+\")$")
+_ORDER_TERM = re.compile(r"^(.+?)((?: (?:asc|desc))?(?: nulls (?:first|last))?)$")
+_DATE_FILTER = re.compile(r"^(?P<column>.+?) ?(?P<op>>=|<=|<|>|=) ?(?P<value>'\d{4}-\d{2}-\d{2}')$")
+_REF = re.compile(r"\{\{\s*ref\(\s*['\"](?P<name>[^'\"]+)['\"]\s*\)\s*\}\}")
+_JINJA = re.compile(r"\{\{.*?\}\}|\{%.*?%\}", re.DOTALL)
+_SOURCE = re.compile(r"\{\{\s*source\(\s*['\"](?P<source>[^'\"]+)['\"]\s*,\s*['\"](?P<name>[^'\"]+)['\"]\s*\)\s*\}\}")
+
+
+def _split_top_level(text: str, separator: str = ",") -> list[str]:
+    """Split on `separator` outside parentheses and quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "'":
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and text.startswith(separator, i):
+            parts.append(text[start:i].strip())
+            start = i + len(separator)
+            i = start
+            continue
+        i += 1
+    parts.append(text[start:].strip())
+    return parts
+
+
+def _canonical(expr: str, alias: str | None) -> str:
+    """Lowercase expression without spacing around punctuation, table qualifiers or identifier quotes."""
+    expr = re.sub(r"\s*([(),:])\s*", r"\1", expr.strip()).replace('"', "")
+    if alias:
+        expr = re.sub(rf"\b{re.escape(alias)}\.", "", expr)
+    return expr
+
+
+def _model_name(table: str) -> str:
+    """`dev."int_transactions"` / `{{ ref('int_transactions') }}` -> int_transactions."""
+    if ref := _REF.fullmatch(table):
+        return ref["name"].lower()
+    return table.replace('"', "").rsplit(".", 1)[-1].lower()
+
+
+def rewrite_aggregate(sql: str) -> tuple[str, str | None]:
+    """
+    `sql` rewritten to read an out_* model when it is a plain aggregate that
+    model already holds, with a note saying so; otherwise `sql` and None.
+
+    Only single-table SELECT ... [WHERE day filters] GROUP BY ... [ORDER BY]
+    [LIMIT] over int_transactions or int_daily_sales is rewritten, and only
+    when every selected column maps onto the rollup.
+    """
+    text = " ".join(re.sub(r";\s*$", "", sql.strip()).split())
+    text = _REF.sub(lambda m: m["name"], text)
+    match = _STATEMENT.match(text.lower())
+    if not match or " select " in f" {match['select']} " or " join " in f" {text.lower()} ":
+        return sql, None
+    base = _model_name(match["table"])
+    if base not in _AGGREGATES:
+        return sql, None
+    alias = match["alias"]
+
+    # Select list -> (kind, key, output alias)
+    items = []
+    for item in _split_top_level(match["select"]):
+        named = _ALIAS.match(item)
+        if named and named["expr"].count("(") == named["expr"].count(")"):
+            expr, name = named["expr"], named["alias"]
+        else:
+            expr, name = item, None
+        canonical = _canonical(expr, alias)
+        if canonical in _DAY_EXPRESSIONS[base]:
+            items.append(("dim", _DAY, name))
+        elif canonical in _DIMENSIONS:
+            items.append(("dim", _DIMENSIONS[canonical], name))
+        elif canonical in _AGGREGATES[base]:
+            items.append(("measure", _AGGREGATES[base][canonical], name))
+        else:
+            return sql, None
+
+    dims = frozenset(key for kind, key, _ in items if kind == "dim")
+    rollup = next((r for r in ROLLUPS if r.dims == dims), None)
+    if rollup is None or any(kind == "measure" and key not in rollup.measures for kind, key, _ in items):
+        return sql, None
+
+    # GROUP BY must be exactly the selected dimensions (by position, alias or expression)
+    def key_of(term: str) -> str | None:
+        term = _canonical(term, alias)
+        if term.isdigit() and 0 < int(term) <= len(items):
+            return items[int(term) - 1][1]
+        for _, key, name in items:
+            if name and term == name.replace('"', ""):
+                return key
+        if term in _DAY_EXPRESSIONS[base]:
+            return _DAY
+        return _DIMENSIONS.get(term) or _AGGREGATES[base].get(term)
+
+    grouped = {key_of(term) for term in _split_top_level(match["group"])} if match["group"] else set()
+    if grouped != set(dims):
+        return sql, None
+
+    filters = []
+    if match["where"]:
+        if not rollup.dated:
+            return sql, None
+        for condition in _split_top_level(match["where"], " and "):
+            predicate = _DATE_FILTER.match(condition)
+            if not predicate:
+                return sql, None
+            column = _canonical(predicate["column"], alias)
+            raw = column in ("transaction_date", "date")
+            # A raw timestamp compared with a day boundary only matches the day column for >= and <
+            if not (column in _DAY_EXPRESSIONS[base] or (raw and predicate["op"] in (">=", "<"))):
+                return sql, None
+            filters.append(f"date {predicate['op']} {predicate['value']}")
+
+    def output(kind: str, key: str) -> str:
+        return "date" if key == _DAY else rollup.measures[key] if kind == "measure" else key
+
+    columns = []
+    for kind, key, name in items:
+        expr = output(kind, key)
+        columns.append(f"{expr} as {name}" if name else expr if expr.isidentifier() else f'{expr} as {key}')
+    rewritten = f"select {', '.join(columns)} from {{{{ ref('{rollup.model}') }}}}"
+    if filters:
+        rewritten += " where " + " and ".join(filters)
+    if match["order"]:
+        order = []
+        for term in _split_top_level(match["order"]):
+            head, direction = _ORDER_TERM.match(term).groups()
+            key = key_of(head)
+            if key is None:
+                return sql, None
+            if head.isdigit() or any(name and head == name.replace('"', "") for _, _, name in items):
+                order.append(term)
+            else:
+                kind = "dim" if key == _DAY or key in _DIMENSIONS.values() else "measure"
+                order.append(output(kind, key) + direction)
+        rewritten += " order by " + ", ".join(order)
+    if match["limit"]:
+        rewritten += f" limit {match['limit']}"
+    note = f"Answered from the pre-aggregated {rollup.model} instead of scanning {base}."
+    if rollup.dated:
+        note += " It only keeps the dates in int_dates; use exact=true for older history."
+    return rewritten, note
+
+
+# ---------- Result summaries ----------
+def _plain(value: Any) -> Any:
+    """A JSON-friendly version of a database value."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+class ResultSummary:
+    """Row count, per-column stats and the first rows of a result, fed one batch at a time."""
+
+    def __init__(self, columns: list[str], max_rows: int):
+        self.columns = columns
+        self.max_rows = max_rows
+        self.rows = 0
+        self.truncated = False
+        self.head: list[list[Any]] = []
+        self._nulls = [0] * len(columns)
+        self._distinct: list[set] = [set() for _ in columns]
+        self._min: list[Any] = [None] * len(columns)
+        self._max: list[Any] = [None] * len(columns)
+        self._sum: list[float | None] = [0.0] * len(columns)
+
+    def add(self, batch: list) -> None:
+        for row in batch:
+            if self.rows >= self.max_rows:
+                self.truncated = True
+                return
+            self.rows += 1
+            if len(self.head) < max(SQL_INLINE_ROWS, SQL_SAMPLE_ROWS):
+                self.head.append([_plain(v) for v in row])
+            for i, value in enumerate(row):
+                if value is None:
+                    self._nulls[i] += 1
+                    continue
+                distinct = self._distinct[i]
+                if len(distinct) <= DISTINCT_CAP:
+                    try:
+                        distinct.add(value)
+                    except TypeError:
+                        distinct.add(repr(value))
+                try:
+                    if self._min[i] is None or value < self._min[i]:
+                        self._min[i] = value
+                    if self._max[i] is None or value > self._max[i]:
+                        self._max[i] = value
+                except TypeError:
+                    pass
+                if self._sum[i] is not None:
+                    if isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool):
+                        self._sum[i] += float(value)
+                    else:
+                        self._sum[i] = None
+
+    def column_stats(self) -> dict[str, dict]:
+        stats = {}
+        for i, name in enumerate(self.columns):
+            values = self.rows - self._nulls[i]
+            distinct = len(self._distinct[i])
+            column = {"nulls": self._nulls[i], "distinct": f"{DISTINCT_CAP}+" if distinct > DISTINCT_CAP else distinct}
+            if values:
+                column["min"], column["max"] = _plain(self._min[i]), _plain(self._max[i])
+                if self._sum[i] is not None:
+                    column["mean"] = round(self._sum[i] / values, 4)
+            stats[name] = column
+        return stats
+
+    def render(self) -> dict[str, Any]:
+        """All rows when there are few, otherwise counts, column stats and the first rows."""
+        count = f"{self.rows}+" if self.truncated else self.rows
+        if self.rows <= SQL_INLINE_ROWS:
+            return {"columns": self.columns, "rows": self.head, "row_count": count}
+        note = f"{self.rows} rows is too many to return; showing column stats and the first {SQL_SAMPLE_ROWS}."
+        if self.truncated:
+            note = (f"Stopped at the {self.max_rows}-row limit; stats cover those rows only. "
+                    "Aggregate or filter in SQL for exact answers.")
+        return {
+            "row_count": count,
+            "truncated": self.truncated,
+            "columns": self.column_stats(),
+            "first_rows": {"columns": self.columns, "rows": self.head[:SQL_SAMPLE_ROWS]},
+            "note": note,
+        }
+
+
+def check_select(sql: str) -> None:
+    """
+    Raise ModelRetry unless `sql` is exactly one SELECT statement.
+
+    Parsed with DuckDB's parser, whose grammar comes from Postgres', for both
+    targets. Jinja ({{ ref() }}, ...) is swapped for a placeholder first.
+    """
+    import duckdb
+
+    try:
+        statements = duckdb.extract_statements(_JINJA.sub("jinja_placeholder", sql))
+    except duckdb.Error as e:
+        raise ModelRetry(f"Could not parse the query: {e}") from e
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise ModelRetry("Only a single SELECT statement can be run.")
+
+
+def limited(sql: str, max_rows: int) -> str:
+    """`sql`, which must be a single SELECT, wrapped so the warehouse stops after max_rows rows."""
+    check_select(sql)
+    sql = re.sub(r";\s*$", "", sql.strip())
+    query = f"select * from (\n{sql}\n) as bounded_query limit {max_rows}"
+    # The wrapped query is checked too, so nothing in `sql` can close the subquery early
+    check_select(query)
+    return query
+
+
+# ---------- Warehouse ----------
+class Warehouse:
+    """Read-only connection to a dbt target, running bounded queries."""
+
+    def __init__(self, target: str, project_dir: str | Path):
+        self.target = target
+        self.project_dir = Path(project_dir)
+        self.schema = os.getenv("DBT_POSTGRES_SCHEMA", "dev")
+        self.index = ManifestIndex(project_dir)
+        self._lock = threading.Lock()
+        self._postgres = None
+
+    @classmethod
+    def from_env(cls, project_dir: str | Path) -> "Warehouse | None":
+        target = os.getenv("DBT_MCP_SQL_TARGET")
+        if target is None:
+            target = "local" if os.getenv("DBT_DUCKDB_PATH") else "dev" if os.getenv("DBT_POSTGRES_HOST") else None
+        return cls(target, project_dir) if target else None
+
+    def resolve_refs(self, sql: str) -> str:
+        """Replace {{ ref() }} / {{ source() }} with relation names from the manifest (bare names otherwise)."""
+        def relation(name: str) -> str:
+            try:
+                return self.index.node(name).get("relation") or name
+            except (KeyError, FileNotFoundError):
+                return name
+        sql = _REF.sub(lambda m: relation(m["name"]), sql)
+        return _SOURCE.sub(lambda m: relation(f"{m['source']}.{m['name']}"), sql)
+
+    def run(self, sql: str, max_rows: int) -> ResultSummary:
+        query = limited(self.resolve_refs(sql), max_rows + 1)
+        with self._lock:
+            # One deadline for the whole query, fetches included
+            deadline = time.monotonic() + SQL_TIMEOUT
+            if self.target == "local":
+                return self._run_duckdb(query, max_rows, deadline)
+            return self._run_postgres(query, max_rows, deadline)
+
+    def _run_duckdb(self, query: str, max_rows: int, deadline: float) -> ResultSummary:
+        import duckdb
+
+        path = Path(os.getenv("DBT_DUCKDB_PATH", "transforms.duckdb"))
+        if not path.is_absolute():
+            path = self.project_dir / path
+        # Opened per query: an open connection holds the file lock dbt needs to build.
+        # No external access, so a query can't read or write files outside the database.
+        try:
+            conn = duckdb.connect(str(path), read_only=True, config={"enable_external_access": False})
+        except duckdb.Error as e:
+            raise ModelRetry(
+                f"The warehouse at {path} is not built yet or is busy (a dbt build holds its lock); "
+                f"retry later. ({e})"
+            ) from e
+        # DuckDB has no statement timeout, so interrupt the query from a timer
+        timer = threading.Timer(SQL_TIMEOUT, conn.interrupt)
+        try:
+            conn.execute(f"set search_path = '{self.schema},main'")
+            conn.execute("set lock_configuration = true")
+            timer.start()
+            cursor = conn.execute(query)
+            return self._fetch(cursor, max_rows, deadline)
+        except duckdb.InterruptException:
+            raise ModelRetry(_timeout_message()) from None
+        except duckdb.Error as e:
+            raise ModelRetry(f"Query failed: {e}") from e
+        finally:
+            timer.cancel()
+            conn.close()
+
+    def _run_postgres(self, query: str, max_rows: int, deadline: float) -> ResultSummary:
+        import psycopg2
+        from psycopg2 import errors
+
+        if self._postgres is None or self._postgres.closed:
+            options = (f"-c statement_timeout={int(SQL_TIMEOUT * 1000)} -c default_transaction_read_only=on "
+                       f"-c search_path={self.schema},public")
+            try:
+                self._postgres = psycopg2.connect(
+                    host=os.getenv("DBT_POSTGRES_HOST"),
+                    user=os.getenv("DBT_POSTGRES_USER"),
+                    password=os.getenv("DBT_POSTGRES_PASSWORD"),
+                    port=int(os.getenv("DBT_POSTGRES_PORT", 5432)),
+                    dbname=os.getenv("DBT_POSTGRES_DB", "neondb"),
+                    sslmode=os.getenv("DBT_POSTGRES_SSLMODE", "require"),
+                    connect_timeout=10,
+                    options=options,
+                )
+            except psycopg2.Error as e:
+                raise ModelRetry(f"The warehouse is unreachable; retry later. ({e})") from e
+        conn = self._postgres
+        # statement_timeout applies to each FETCH of a named cursor, not the whole
+        # query, so cancel from a timer once the deadline passes
+        timer = threading.Timer(SQL_TIMEOUT, conn.cancel)
+        try:
+            timer.start()
+            # Named (server-side) cursor, so rows arrive SQL_BATCH_ROWS at a time
+            with conn.cursor(name="bounded_query") as cursor:
+                cursor.itersize = SQL_BATCH_ROWS
+                cursor.execute(query)
+                return self._fetch(cursor, max_rows, deadline)
+        except errors.QueryCanceled:
+            raise ModelRetry(_timeout_message()) from None
+        except psycopg2.Error as e:
+            raise ModelRetry(f"Query failed: {e}") from e
+        finally:
+            timer.cancel()
+            if not conn.closed:
+                conn.rollback()
+
+    @staticmethod
+    def _fetch(cursor, max_rows: int, deadline: float) -> ResultSummary:
+        # The query asks for one row past max_rows, so a full result is told apart from a cut one
+        batch = cursor.fetchmany(SQL_BATCH_ROWS)
+        summary = ResultSummary([d[0] for d in cursor.description], max_rows)
+        while batch:
+            summary.add(batch)
+            if summary.truncated:
+                break
+            # The timer only interrupts a running statement, not time spent between fetches
+            if time.monotonic() > deadline:
+                raise ModelRetry(_timeout_message())
+            batch = cursor.fetchmany(SQL_BATCH_ROWS)
+        return summary
+
+
+def _timeout_message() -> str:
+    return (f"Query cancelled after {SQL_TIMEOUT:g}s. Filter it, aggregate it, or read an out_* summary model "
+            "instead of scanning raw transactions.")
+
+
+def sql_toolset(project_dir: str | Path) -> FunctionToolset | None:
+    """The run_sql tool against the configured dbt target, or None when no warehouse is configured."""
+    if os.getenv("DBT_MCP_SQL_LIMITS", "1") == "0":
+        return None
+    warehouse = Warehouse.from_env(project_dir)
+    if warehouse is None:
+        return None
+
+    def run_sql(sql: str, max_rows: int | None = None, exact: bool = False) -> dict[str, Any]:
+        """Run a read-only SQL query against the warehouse.
+
+        Reference models by name (`int_transactions`) or with {{ ref('...') }}. Small
+        results come back in full; large ones come back as a row count, column stats
+        and the first rows, so aggregate in SQL rather than selecting raw rows. Daily,
+        per-store and per-product totals are in the out_* models.
+
+        Args:
+            sql: A single SELECT statement.
+            max_rows: Stop reading after this many rows (capped by the server limit).
+            exact: Query the tables as written, without reading pre-aggregated out_* models.
+        """
+        limit = min(max_rows or SQL_MAX_ROWS, SQL_MAX_ROWS)
+        note = None
+        if not exact and os.getenv("DBT_MCP_SQL_REWRITE", "1") != "0":
+            sql, note = rewrite_aggregate(sql)
+        result = warehouse.run(sql, limit).render()
+        if note:
+            result["rewritten_sql"], result["rewrite_note"] = sql, note
+        return result
+
+    return FunctionToolset([run_sql], max_retries=2)
+
+
+# ---------- dbt-mcp SQL tools ----------
+def _rows_in(data: Any) -> list[dict] | None:
+    """The rows of a dbt show / execute_sql payload, if it is one."""
+    if isinstance(data, dict):
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        return data
+    return None
+
+
+def bound_result(result: Any) -> Any:
+    """`result` unchanged when it holds few rows, else a summary of them (or a truncated copy of long text)."""
+    data = result
+    if isinstance(result, str):
+        try:
+            data = json.loads(result)
+        except ValueError:
+            limit = SQL_INLINE_ROWS * 200
+            if len(result) <= limit:
+                return result
+            return result[:limit] + f"\n... [{len(result) - limit} more characters cut]"
+    rows = _rows_in(data)
+    if rows is None or len(rows) <= SQL_INLINE_ROWS:
+        return result
+    columns = list(rows[0])
+    summary = ResultSummary(columns, SQL_MAX_ROWS)
+    summary.add([[row.get(c) for c in columns] for row in rows])
+    rendered = summary.render()
+    return json.dumps(rendered, default=str) if isinstance(result, str) else rendered
+
+
+@dataclass
+class BoundedSqlToolset(WrapperToolset):
+    """Clamp the row limit of dbt-mcp SQL tools, rewrite rollup-able aggregates and summarize big results."""
+
+    async def call_tool(
+        self, name: str, tool_args: dict[str, Any], ctx: RunContext[Any], tool: ToolsetTool[Any]
+    ) -> Any:
+        if name not in SQL_TOOLS:
+            return await super().call_tool(name, tool_args, ctx, tool)
+        tool_args = dict(tool_args)
+        note = None
+        sql_arg = next((k for k in ("sql_query", "sql") if isinstance(tool_args.get(k), str)), None)
+        if sql_arg and os.getenv("DBT_MCP_SQL_REWRITE", "1") != "0":
+            tool_args[sql_arg], note = rewrite_aggregate(tool_args[sql_arg])
+        if "limit" in tool.tool_def.parameters_json_schema.get("properties", {}):
+            # Left alone when omitted: dbt-mcp's own default is small
+            limit = tool_args.get("limit")
+            if limit is not None and not 0 < limit <= SQL_MAX_ROWS:
+                tool_args["limit"] = SQL_MAX_ROWS
+        elif sql_arg:
+            tool_args[sql_arg] = limited(tool_args[sql_arg], SQL_MAX_ROWS)
+        result = bound_result(await super().call_tool(name, tool_args, ctx, tool))
+        if note is None:
+            return result
+        return f"{note}\n{result}" if isinstance(result, str) else {"note": note, "result": result}
+
+
+def bounded(toolset: AbstractToolset) -> AbstractToolset:
+    """Wrap `toolset` so its SQL tools return bounded results, unless DBT_MCP_SQL_LIMITS=0."""
+    if os.getenv("DBT_MCP_SQL_LIMITS", "1") == "0":
+        return toolset
+    return BoundedSqlToolset(toolset)
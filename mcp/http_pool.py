@@ -0,0 +1,152 @@
+"""
+Shared HTTP connection pool for the hosted dbt MCP server.
+
+The remote CLI used a throwaway httpx client for its health check, and
+MCPServerStreamableHTTP then opened connections of its own with no retry
+policy. build_http_client() returns one pooled client that both can share:
+
+    client = build_http_client(headers)
+    await client.get(url)                                  # health check
+    server = MCPServerStreamableHTTP(url=url, http_client=client)
+    ...
+    await client.aclose()
+
+Keepalive connections are reused across requests and MCP sessions, HTTP/2
+is negotiated through `h2` (pulled in by the `httpx[http2]` dependency;
+without it the client falls back to HTTP/1.1), and connect and read timeouts are set
+separately. Requests that never reached the server (connect errors) are
+retried for every method; idempotent requests (GET, HEAD, ...) are also
+retried on read errors and 429/502/503/504, with jittered exponential
+backoff. MCP tool calls are POSTs and are not replayed once sent.
+
+Every knob has a DBT_MCP_HTTP_* environment variable; see HttpSettings.
+"""
+
+import asyncio
+import os
+import random
+from dataclasses import dataclass, field
+from importlib.util import find_spec
+
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Raised before any byte of the request reached the server, so always safe to retry.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# The request may have been processed; only retried for idempotent methods.
+IN_FLIGHT_ERRORS = (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+def _env(name: str, default, cast=float):
+    value = os.getenv(name)
+    return default if value in (None, "") else cast(value)
+
+
+@dataclass
+class HttpSettings:
+    connect_timeout: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_CONNECT_TIMEOUT", 5.0))
+    read_timeout: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_READ_TIMEOUT", 300.0))
+    write_timeout: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_WRITE_TIMEOUT", 30.0))
+    pool_timeout: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_POOL_TIMEOUT", 10.0))
+    max_connections: int = field(default_factory=lambda: _env("DBT_MCP_HTTP_MAX_CONNECTIONS", 20, int))
+    max_keepalive: int = field(default_factory=lambda: _env("DBT_MCP_HTTP_MAX_KEEPALIVE", 10, int))
+    keepalive_expiry: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_KEEPALIVE_EXPIRY", 60.0))
+    http2: bool = field(default_factory=lambda: os.getenv("DBT_MCP_HTTP2", "1") != "0")
+    retries: int = field(default_factory=lambda: _env("DBT_MCP_HTTP_RETRIES", 3, int))
+    backoff: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_BACKOFF", 0.25))
+    max_backoff: float = field(default_factory=lambda: _env("DBT_MCP_HTTP_MAX_BACKOFF", 8.0))
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retry failed requests on top of another transport with full-jitter exponential backoff."""
+
+    def __init__(self, wrapped: httpx.AsyncBaseTransport, retries: int, backoff: float, max_backoff: float):
+        self.wrapped = wrapped
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retried = 0
+
+    def _delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                response = await self.wrapped.handle_async_request(request)
+            except NOT_SENT_ERRORS:
+                if attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt)
+            except IN_FLIGHT_ERRORS:
+                if not idempotent or attempt >= self.retries:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if not idempotent or response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                delay = self._delay(attempt, response)
+                await response.aclose()
+            attempt += 1
+            self.retried += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class PooledAsyncClient(httpx.AsyncClient):
+    """
+    An AsyncClient that outlives `async with` blocks.
+
+    The MCP streamable-HTTP transport enters and closes the client it is
+    given when a session ends; this one ignores that so the pool survives
+    reconnects and can be shared. Close it once with `aclose()`.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        return None
+
+
+def http2_available() -> bool:
+    return find_spec("h2") is not None
+
+
+def build_http_client(headers: dict | None = None, settings: HttpSettings | None = None) -> PooledAsyncClient:
+    """One pooled, retrying client for the health check and the MCP transport."""
+    settings = settings or HttpSettings()
+    http2 = settings.http2 and http2_available()
+    transport = RetryTransport(
+        httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+        ),
+        retries=settings.retries,
+        backoff=settings.backoff,
+        max_backoff=settings.max_backoff,
+    )
+    return PooledAsyncClient(
+        headers=headers,
+        transport=transport,
+        timeout=httpx.Timeout(
+            connect=settings.connect_timeout,
+            read=settings.read_timeout,
+            write=settings.write_timeout,
+            pool=settings.pool_timeout,
+        ),
+        follow_redirects=True,
+    )
@@ -0,0 +1,293 @@
+"""
+Offline load test for the dbt assistant's client stack.
+
+Runs N concurrent sessions through the same build_agent() used by the CLIs
+(or archive/agent.py), with OpenAI replaced by a scripted model and dbt-mcp
+replaced by stub_mcp_server.py. Nothing leaves the machine, so the numbers
+measure only the client side: toolset wrappers, MCP transports, memory.
+
+    python load_test.py --sessions 20 --turns 5
+    python load_test.py --stack remote --sessions 50 --model-latency 0.5
+    python load_test.py --scenarios scenarios.jsonl --spec tools.json
+
+Each scenario line is {"question": ..., "steps": [[{"tool": ..., "args": {...}}, ...], ...],
+"answer": ...}: every step is one model response issuing those tool calls
+(in parallel), and the answer follows the last step. Session i asks the
+scenarios in turn starting at scenario i, with conversation memory, so
+follow-ups carry history like the interactive CLIs do.
+
+Reports throughput, p50/p95/p99 turn latency and client memory (RSS) per
+open session.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from pydantic_ai import Agent
+from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, ToolCallPart, UserPromptPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from memory import ConversationMemory
+from tool_pruning import FALLBACK_TOOL
+from tracing import percentiles, tracer
+
+STUB_SERVER = Path(__file__).parent / "stub_mcp_server.py"
+
+
+@dataclass
+class Scenario:
+    question: str
+    steps: list[list[dict]] = field(default_factory=list)
+    answer: str = "Done."
+
+
+DEFAULT_SCENARIOS = [
+    Scenario(
+        "List all models in my project",
+        [[{"tool": "list_models", "args": {}}]],
+        "The project has staging, intermediate and mart models.",
+    ),
+    Scenario(
+        "Which models depend on stg_orders and what are their parents?",
+        [
+            [{"tool": "get_model_children", "args": {"model_name": "stg_orders"}}],
+            [{"tool": "get_model_parents", "args": {"model_name": "fct_orders"}},
+             {"tool": "get_model_details", "args": {"model_name": "fct_orders"}}],
+        ],
+        "fct_orders depends on stg_orders and stg_customers.",
+    ),
+    Scenario(
+        "Show me sources and their downstream models",
+        [[{"tool": "get_all_sources", "args": {}}], [{"tool": "list_models", "args": {}}]],
+        "Three sources feed the staging layer.",
+    ),
+    Scenario(
+        "How many rows are in fct_orders? Run a quick SQL count",
+        [[{"tool": "show", "args": {"sql_query": "select count(*) from {{ ref('fct_orders') }}"}}]],
+        "fct_orders has 1,000,000 rows.",
+    ),
+]
+
+
+def read_scenarios(path: str) -> list[Scenario]:
+    with open(path) as f:
+        return [Scenario(**json.loads(line)) for line in f if line.strip()]
+
+
+def _latest_turn(messages: list[ModelMessage]) -> tuple[str, list[ModelMessage]]:
+    """The latest user question and the messages after it."""
+    for i in range(len(messages) - 1, -1, -1):
+        message = messages[i]
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+                    return part.content, messages[i + 1:]
+    return "", messages
+
+
+def scripted_model(scenarios: list[Scenario], latency: float = 0.0) -> FunctionModel:
+    """
+    A model that replays each scenario's tool calls, then its answer.
+
+    The step is worked out from the messages since the question, so one
+    model serves any number of concurrent runs. If a scripted tool was
+    pruned from the offered list, it calls show_all_tools first, as a
+    real model would. `latency` seconds are spent on every response.
+    """
+    by_question = {s.question: s for s in scenarios}
+
+    async def respond(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if latency:
+            await asyncio.sleep(latency)
+        question, turn = _latest_turn(messages)
+        scenario = by_question.get(question, Scenario(question))
+        responses = [m for m in turn if isinstance(m, ModelResponse)]
+        step = sum(1 for m in responses if not all(
+            isinstance(p, ToolCallPart) and p.tool_name == FALLBACK_TOOL for p in m.parts
+        ))
+        if step >= len(scenario.steps):
+            return ModelResponse(parts=[TextPart(scenario.answer)])
+        calls = scenario.steps[step]
+        offered = {t.name for t in info.function_tools}
+        if FALLBACK_TOOL in offered and any(c["tool"] not in offered for c in calls):
+            return ModelResponse(parts=[ToolCallPart(FALLBACK_TOOL, {})])
+        return ModelResponse(parts=[ToolCallPart(c["tool"], c.get("args", {})) for c in calls])
+
+    return FunctionModel(respond, model_name="scripted")
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+async def _session(
+    session_id: int,
+    agent_factory: Callable[[], Agent],
+    scenarios: list[Scenario],
+    turns: int,
+    results: list[dict],
+    ready: asyncio.Barrier,
+) -> None:
+    agent = agent_factory()
+    async with agent:
+        memory = ConversationMemory()
+        for n in range(turns):
+            question = scenarios[(session_id + n) % len(scenarios)].question
+            started = time.perf_counter()
+            record = {"session": session_id, "turn": n}
+            try:
+                with tracer().turn(question) as turn:
+                    run = await agent.run(question, message_history=memory.history())
+                    turn.done(run)
+                memory.add(run.new_messages())
+                record["requests"] = run.usage().requests
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+            record["seconds"] = time.perf_counter() - started
+            results.append(record)
+        # Hold the session open until every session is done, so memory is measured with all of them live
+        try:
+            await ready.wait()
+        except asyncio.BrokenBarrierError:
+            pass  # another session died; run_load released the rest
+
+
+async def run_load(
+    agent_factory: Callable[[], Agent], scenarios: list[Scenario], sessions: int, turns: int
+) -> dict:
+    """Run `sessions` concurrent sessions of `turns` questions each and collect the numbers."""
+    results: list[dict] = []
+    ready = asyncio.Barrier(sessions + 1)
+    baseline = rss_bytes()
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(_session(i, agent_factory, scenarios, turns, results, ready))
+        for i in range(sessions)
+    ]
+    # Wait until every session has finished its turns (or died) before sampling memory
+    while ready.n_waiting + sum(t.done() for t in tasks) < sessions:
+        await asyncio.sleep(0.05)
+    wall = time.perf_counter() - started
+    rss = rss_bytes()
+    if any(t.done() for t in tasks):
+        # A dead session never reaches the barrier, so release the others instead of waiting for it
+        await ready.abort()
+    else:
+        await ready.wait()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "results": results,
+        "wall": wall,
+        "rss_per_session": (rss - baseline) / sessions,
+        "session_errors": [
+            f"session {i}: {type(t.exception()).__name__}: {t.exception()}" for i, t in enumerate(tasks) if t.exception()
+        ],
+    }
+
+
+def report(stats: dict, sessions: int) -> str:
+    results = stats["results"]
+    ok = [r["seconds"] for r in results if "error" not in r]
+    errors = [r["error"] for r in results if "error" in r] + stats["session_errors"]
+    p50, p95, p99 = percentiles(ok)
+    lines = [
+        f"sessions: {sessions}  turns: {len(results)} ({len(errors)} errors)  wall: {stats['wall']:.2f}s",
+        f"throughput: {len(ok) / stats['wall']:.2f} turns/s",
+        f"turn latency: p50 {p50:.3f}s  p95 {p95:.3f}s  p99 {p99:.3f}s",
+        f"client RSS per session: {stats['rss_per_session'] / 1e6:.2f} MB",
+    ]
+    for error in sorted(set(errors))[:5]:
+        lines.append(f"  error: {error}")
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"stub MCP server did not start on port {port}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the assistant's client stack offline.")
+    parser.add_argument("--stack", choices=["local", "remote", "archive"], default="local",
+                        help="Whose build_agent to use: the core CLI (stdio), the remote CLI (streamable HTTP), "
+                             "or the Streamlit app (stdio)")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent sessions (default: 10)")
+    parser.add_argument("--turns", type=int, default=4, help="Questions per session (default: 4)")
+    parser.add_argument("--scenarios", help="JSONL file of scripted scenarios (default: built-in)")
+    parser.add_argument("--spec", help="Stub server tool spec (see stub_mcp_server.py)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Stub tool latency jitter fraction")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per scripted model response")
+    args = parser.parse_args()
+
+    scenarios = read_scenarios(args.scenarios) if args.scenarios else DEFAULT_SCENARIOS
+    model = scripted_model(scenarios, args.model_latency)
+    stub_args = [str(STUB_SERVER), "--jitter", str(args.jitter)] + (["--spec", args.spec] if args.spec else [])
+
+    http_server = None
+    http_client = None
+    if args.stack == "remote":
+        from http_pool import build_http_client
+        from remote_mcp_local_client_starter_cli import build_agent as build_remote_agent
+        port = _free_port()
+        http_server = subprocess.Popen(
+            [sys.executable, *stub_args, "--transport", "streamable-http", "--port", str(port)]
+        )
+        _wait_for_port(port)
+        url = f"http://127.0.0.1:{port}/mcp/"
+        http_client = build_http_client()
+        agent_factory = lambda: build_remote_agent(url, {}, http_client, model=model)
+    else:
+        if args.stack == "archive":
+            sys.path.insert(0, str(Path(__file__).parent / "archive"))
+            from agent import build_agent
+        else:
+            from local_mcp_local_client_core_cli import build_agent
+        agent_factory = lambda: build_agent(MCPServerStdio(sys.executable, stub_args, timeout=30), model=model)
+
+    async def run() -> dict:
+        try:
+            return await run_load(agent_factory, scenarios, args.sessions, args.turns)
+        finally:
+            if http_client is not None:
+                await http_client.aclose()
+
+    try:
+        stats = asyncio.run(run())
+    finally:
+        if http_server is not None:
+            http_server.terminate()
+            http_server.wait()
+    print(report(stats, args.sessions))
+
+
+if __name__ == "__main__":
+    main()
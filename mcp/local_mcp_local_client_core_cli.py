@@ -11,65 +11,187 @@ Simple command-line interface to ask questions about your dbt project
 #         value = '***REDACTED***'
 #     print(f"{key}={value}")
 
+import time
+
+# Process start, for --timing
+STARTED = time.perf_counter()
+
+import argparse
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai import Agent, RunContext
+from pydantic_ai.mcp import MCPServer, MCPServerStdio
+from pydantic_ai.models import Model
+from pydantic_ai.messages import FunctionToolCallEvent, FunctionToolResultEvent
+from pydantic_ai.toolsets import AbstractToolset
 import os
 
+from bounded_sql import bounded, sql_toolset
+from manifest_index import manifest_toolset
+from memory import ConversationMemory
+from startup import PhaseTimer, PrewarmedToolset, prewarmed, read_line, resolve_dbt_mcp
+from tool_cache import cached
+from tool_pruning import pruned
+from tracing import traced, tracer
+
 # Load the base environment variables
 BASE_DIR = Path(__file__).parent.parent
 load_dotenv(BASE_DIR / ".env", override=True)
 load_dotenv(BASE_DIR / ".env.core", override=True)
+IMPORTED = time.perf_counter()
 
-async def main() -> None:
-    print("\n" + "=" * 70)
-    print("🔧 dbt Assistant - Interactive CLI")
-    print("=" * 70)
-    print("Initializing...")
 
-    # Local dbt MCP server over stdio
-    dbt_server = MCPServerStdio(
-        command=os.getenv("DBT_MCP_BIN"),
-        args=[],
+class TurnTimer:
+    """Wall-clock breakdown of one question: first token, tool calls, total."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: float | None = None
+        self.tool_seconds = 0.0
+        self.tool_calls = 0
+        self._pending: dict[str, float] = {}
+
+    def token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+
+    def tool_started(self, call_id: str) -> None:
+        self.tool_calls += 1
+        self._pending[call_id] = time.perf_counter()
+
+    def tool_finished(self, call_id: str) -> None:
+        started = self._pending.pop(call_id, None)
+        if started is not None:
+            self.tool_seconds += time.perf_counter() - started
+
+    def summary(self) -> str:
+        total = time.perf_counter() - self.started
+        ttft = f"{self.first_token:.2f}s" if self.first_token is not None else "-"
+        return (
+            f"⏱  first token {ttft} · tools {self.tool_seconds:.2f}s "
+            f"({self.tool_calls} call{'s' if self.tool_calls != 1 else ''}) · total {total:.2f}s"
+        )
+
+
+def dbt_mcp_server() -> MCPServerStdio:
+    """Local dbt MCP server over stdio (DBT_MCP_BIN, else the dbt-mcp found next to Python or on PATH)."""
+    command, args, _ = resolve_dbt_mcp(os.getenv("DBT_MCP_BIN"))
+    return MCPServerStdio(
+        command=command,
+        args=args,
         env={
             **os.environ,
         },
         timeout=30,
     )
 
-    # Create the agent
-    agent = Agent(
-        model=os.getenv("OPENAI_MODEL"),
-        toolsets=[dbt_server], 
+
+def build_agent(dbt_server: MCPServer | AbstractToolset | None = None, model: Model | str | None = None) -> Agent:
+    """
+    Create an Agent wired to its own local dbt-mcp subprocess over stdio.
+
+    `dbt_server` and `model` replace dbt-mcp and OPENAI_MODEL, e.g. with the
+    stub server and scripted model of load_test.py, or with a server main()
+    already started.
+    """
+    if dbt_server is None:
+        dbt_server = dbt_mcp_server()
+
+    project_dir = os.getenv("DBT_PROJECT_DIR")
+    toolsets = [pruned(traced(bounded(cached(prewarmed(dbt_server), project_dir=project_dir))))]
+    if project_dir:
+        # Lineage and column lookups straight from target/manifest.json
+        toolsets.append(traced(manifest_toolset(project_dir)))
+        # Bounded queries straight to the warehouse, when one is configured
+        if (sql_tools := sql_toolset(project_dir)) is not None:
+            toolsets.append(traced(sql_tools))
+
+    return Agent(
+        model=model or os.getenv("OPENAI_MODEL"),
+        toolsets=toolsets,
         instructions=(
             "You are a helpful dbt assistant. "
             "Provide clear, concise answers about the dbt project. "
-            "When listing items, be organized and easy to read."
+            "When listing items, be organized and easy to read. "
+            "Prefer the manifest_* tools for lineage, dependency and column questions. "
+            "For questions about the data, aggregate in SQL rather than selecting raw rows."
         ),
     )
 
+
+async def main(timing: bool = False) -> None:
+    print("\n" + "=" * 70)
+    print("🔧 dbt Assistant - Interactive CLI")
+    print("=" * 70)
+    print("Initializing...")
+
+    timer = PhaseTimer(STARTED)
+    timer.add("imports + .env", STARTED, IMPORTED)
+    with timer.span("resolve dbt-mcp"):
+        dbt_server = prewarmed(dbt_mcp_server(), timer)
+    # Spawn dbt-mcp now and build the agent (importing the model provider) while it boots
+    if isinstance(dbt_server, PrewarmedToolset):
+        dbt_server.startup.start()
+    with timer.span("build agent"):
+        agent = await asyncio.to_thread(build_agent, dbt_server)
+
     print("✓ Ready!\n")
 
+    # Earlier turns, compacted to a token budget, so follow-ups don't start from scratch
+    memory = ConversationMemory()
+
     # Start/stop MCP servers with the agent context
     async with agent:
-        print("Ask questions about your dbt project (type 'exit' to quit)")
+        print("Ask questions about your dbt project (type 'exit' to quit, 'reset' to forget the conversation)")
         print("Example: 'List all models in my project'\n")
+        timer.mark("prompt ready")
+        first = True
 
         while True:
             try:
-                query = input("You: ").strip()
+                query = (await read_line("You: ")).strip()
                 if query.lower() in {"exit", "quit", "q"}:
                     print("\n👋 Goodbye!")
                     break
                 if not query:
                     continue
+                if query.lower() == "reset":
+                    memory.clear()
+                    print("🧹 Conversation memory cleared\n")
+                    continue
+
+                turn_timer = TurnTimer()
+
+                # Tool calls print as they happen; their time counts towards the tool total
+                async def event_handler(ctx: RunContext, event_stream):
+                    async for event in event_stream:
+                        if isinstance(event, FunctionToolCallEvent):
+                            turn_timer.tool_started(event.part.tool_call_id)
+                            print(f"\n🔧 Tool called: {event.part.tool_name}")
+                            print(f"   Arguments: {event.part.args}")
+                        elif isinstance(event, FunctionToolResultEvent):
+                            turn_timer.tool_finished(event.tool_call_id)
 
                 print("\n🤖 Assistant: ", end="", flush=True)
-                result = await agent.run(query)
-                print(result.output)
+                with tracer().turn(query) as turn:
+                    chunks = []
+                    async with agent.run_stream(
+                        query, message_history=memory.history(), event_stream_handler=event_handler
+                    ) as result:
+                        async for text in result.stream_text(delta=True):
+                            turn_timer.token()
+                            chunks.append(text)
+                            print(text, end="", flush=True)
+                    turn.done(result, answer="".join(chunks))
+                    memory.add(result.new_messages())
+                print()
+                print(turn_timer.summary())
                 print()
+                if timing and first:
+                    timer.add("first answer", turn_timer.started)
+                    print(timer.report() + "\n")
+                first = False
 
             except KeyboardInterrupt:
                 print("\n\n👋 Goodbye!")
@@ -78,4 +200,9 @@ async def main() -> None:
                 print(f"\n❌ Error: {e}\n")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Ask questions about your dbt project through a local dbt-mcp.")
+    parser.add_argument("--timing", action="store_true", help="Print a startup phase breakdown after the first answer")
+    try:
+        asyncio.run(main(parser.parse_args().timing))
+    except KeyboardInterrupt:
+        print("\n\n👋 Goodbye!")
@@ -0,0 +1,240 @@
+"""
+In-memory index over a dbt project's target/manifest.json.
+
+Lineage and metadata questions otherwise go through dbt-mcp, which shells
+out to the dbt CLI for each one. ManifestIndex loads the manifest once and
+keeps lookups by name, parent/child adjacency, source consumers and column
+docs in dicts, so walking the graph is a few dictionary hops.
+manifest_toolset() exposes it to the agent next to the MCP server:
+
+    agent = Agent(model, toolsets=[dbt_server, manifest_toolset(project_dir)])
+
+The manifest is re-stat'ed on every lookup. When dbt rewrites it, only nodes
+whose checksum, config or docs changed are re-indexed; adjacency comes
+straight from the manifest's parent_map/child_map.
+"""
+
+import functools
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai import ModelRetry
+from pydantic_ai.toolsets import FunctionToolset
+
+# Which node wins when several resources share a name.
+RESOURCE_PRIORITY = ("model", "seed", "snapshot", "source", "exposure", "metric", "semantic_model", "analysis", "test")
+
+
+def _node_summary(node: dict) -> dict:
+    summary = {
+        "unique_id": node["unique_id"],
+        "resource_type": node["resource_type"],
+        "name": node["name"],
+        "description": node.get("description") or "",
+        "path": node.get("original_file_path"),
+    }
+    config = node.get("config") or {}
+    if config.get("materialized"):
+        summary["materialized"] = config["materialized"]
+    if node.get("relation_name"):
+        summary["relation"] = node["relation_name"]
+    return summary
+
+
+def _node_columns(node: dict) -> dict:
+    return {
+        name: {k: v for k, v in (("description", col.get("description")), ("data_type", col.get("data_type"))) if v}
+        for name, col in (node.get("columns") or {}).items()
+    }
+
+
+def _node_signature(node: dict) -> tuple:
+    """What has to change for a node's indexed entry to be rebuilt."""
+    return (
+        (node.get("checksum") or {}).get("checksum"),
+        (node.get("config") or {}).get("materialized"),
+        node.get("relation_name"),
+        node.get("description"),
+        json.dumps(node.get("columns") or {}, sort_keys=True),
+    )
+
+
+class ManifestIndex:
+    """Name, lineage and column lookups over target/manifest.json, reloaded when the file changes."""
+
+    def __init__(self, project_dir: str | Path):
+        self.manifest_path = Path(project_dir) / "target" / "manifest.json"
+        self.reloads = 0
+        self._stat: tuple | None = None
+        self._nodes: dict[str, dict] = {}
+        self._signatures: dict[str, tuple] = {}
+        self._summaries: dict[str, dict] = {}
+        self._columns: dict[str, dict] = {}
+        self._by_name: dict[str, list[str]] = {}
+        self._parents: dict[str, list[str]] = {}
+        self._children: dict[str, list[str]] = {}
+
+    def refresh(self) -> None:
+        """Reload the manifest if its mtime or size changed since the last load."""
+        try:
+            st = os.stat(self.manifest_path)
+        except OSError:
+            raise FileNotFoundError(f"{self.manifest_path} not found; run `dbt parse` first") from None
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat == self._stat:
+            return
+        manifest = json.loads(self.manifest_path.read_text())
+        self._load(manifest)
+        self._stat = stat
+        self.reloads += 1
+
+    def _load(self, manifest: dict) -> None:
+        nodes = {}
+        for section in ("nodes", "sources", "exposures", "metrics", "semantic_models"):
+            nodes.update(manifest.get(section) or {})
+
+        for unique_id in self._nodes.keys() - nodes.keys():
+            del self._signatures[unique_id], self._summaries[unique_id], self._columns[unique_id]
+        for unique_id, node in nodes.items():
+            signature = _node_signature(node)
+            if self._signatures.get(unique_id) == signature:
+                continue
+            self._signatures[unique_id] = signature
+            self._summaries[unique_id] = _node_summary(node)
+            self._columns[unique_id] = _node_columns(node)
+
+        if nodes.keys() != self._nodes.keys():
+            by_name: dict[str, list[str]] = {}
+            for unique_id, node in nodes.items():
+                by_name.setdefault(node["name"].lower(), []).append(unique_id)
+                if node["resource_type"] == "source":
+                    by_name.setdefault(f"{node['source_name']}.{node['name']}".lower(), []).append(unique_id)
+            rank = {t: i for i, t in enumerate(RESOURCE_PRIORITY)}
+            for ids in by_name.values():
+                ids.sort(key=lambda uid: rank.get(nodes[uid]["resource_type"], len(rank)))
+            self._by_name = by_name
+
+        self._nodes = nodes
+        self._parents = manifest.get("parent_map") or {}
+        self._children = manifest.get("child_map") or {}
+
+    def resolve(self, name: str) -> str:
+        """Map a model/source/seed name (or unique_id, or `source.table`) to a unique_id."""
+        self.refresh()
+        if name in self._nodes:
+            return name
+        ids = self._by_name.get(name.lower())
+        if not ids:
+            raise KeyError(f"No node named {name!r} in the manifest")
+        return ids[0]
+
+    def node(self, name: str) -> dict:
+        unique_id = self.resolve(name)
+        return {**self._summaries[unique_id], "columns": self._columns[unique_id]}
+
+    def columns(self, name: str) -> dict:
+        return self._columns[self.resolve(name)]
+
+    def parents(self, name: str) -> list[str]:
+        return list(self._parents.get(self.resolve(name), []))
+
+    def children(self, name: str) -> list[str]:
+        return list(self._children.get(self.resolve(name), []))
+
+    def walk(self, name: str, direction: str, max_depth: int | None = None, include_tests: bool = False) -> list[dict]:
+        """Breadth-first walk up ('upstream') or down ('downstream') the DAG."""
+        start = self.resolve(name)
+        edges = self._parents if direction == "upstream" else self._children
+        seen = {start}
+        found = []
+        queue = deque([(start, 0)])
+        while queue:
+            unique_id, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for other in edges.get(unique_id, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                if not include_tests and other.startswith("test."):
+                    continue
+                summary = self._summaries.get(other, {"unique_id": other})
+                found.append({**summary, "depth": depth + 1})
+                queue.append((other, depth + 1))
+        return found
+
+
+def _retry_on_lookup_error(func):
+    """Hand unknown names and a missing manifest back to the model instead of failing the run."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except (KeyError, FileNotFoundError) as e:
+            raise ModelRetry(str(e).strip("'\"")) from e
+    return wrapper
+
+
+def manifest_toolset(project_dir: str | Path) -> FunctionToolset:
+    """Agent tools answering lineage and metadata questions from a ManifestIndex."""
+    index = ManifestIndex(project_dir)
+
+    def manifest_node(name: str) -> dict[str, Any]:
+        """Look up a model, source, seed or snapshot by name and return its description, materialization and columns.
+
+        Args:
+            name: Node name, `source_name.table_name` for sources, or a full unique_id.
+        """
+        return index.node(name)
+
+    def manifest_columns(name: str) -> dict[str, Any]:
+        """Return the documented columns (description and data type) of a model or source.
+
+        Args:
+            name: Node name, `source_name.table_name` for sources, or a full unique_id.
+        """
+        return index.columns(name)
+
+    def manifest_upstream(name: str, max_depth: int | None = None) -> list[dict[str, Any]]:
+        """List everything a node depends on, nearest first.
+
+        Args:
+            name: Node name or unique_id.
+            max_depth: Stop after this many hops; omit for the full upstream lineage.
+        """
+        return index.walk(name, "upstream", max_depth)
+
+    def manifest_downstream(name: str, max_depth: int | None = None, include_tests: bool = False) -> list[dict[str, Any]]:
+        """List everything that depends on a node (models, snapshots, exposures...), nearest first.
+
+        Use this for sources too, to find the models built on them.
+
+        Args:
+            name: Node name, `source_name.table_name` for sources, or a unique_id.
+            max_depth: Stop after this many hops; omit for the full downstream lineage.
+            include_tests: Also list the data tests attached along the way.
+        """
+        return index.walk(name, "downstream", max_depth, include_tests)
+
+    def manifest_lineage(name: str) -> dict[str, Any]:
+        """Return a node with its direct parents and children and its full upstream and downstream lineage.
+
+        Args:
+            name: Node name, `source_name.table_name` for sources, or a unique_id.
+        """
+        return {
+            "node": index.node(name),
+            "parents": index.parents(name),
+            "children": [c for c in index.children(name) if not c.startswith("test.")],
+            "upstream": index.walk(name, "upstream"),
+            "downstream": index.walk(name, "downstream"),
+        }
+
+    tools = [manifest_node, manifest_columns, manifest_upstream, manifest_downstream, manifest_lineage]
+    return FunctionToolset(
+        [_retry_on_lookup_error(tool) for tool in tools],
+        max_retries=2,
+    )
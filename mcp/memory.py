@@ -0,0 +1,152 @@
+"""
+Bounded conversation memory for follow-up questions.
+
+Running every question without message_history makes follow-ups repeat the
+same discovery tool calls, but passing the whole history grows the prompt
+with every turn. ConversationMemory keeps the turns and compacts them into
+a token budget as they are added:
+
+    memory = ConversationMemory()
+    result = await agent.run(question, message_history=memory.history())
+    memory.add(result.new_messages())
+
+1. Tool results from earlier turns are cut to DBT_MCP_MEMORY_TOOL_CHARS
+   characters (full model listings are the usual culprit). The most
+   recent turn is kept intact while the history fits in
+   DBT_MCP_MEMORY_TOKENS; past that, its tool results are cut too.
+2. If the estimate is still over the budget, the oldest turns are dropped
+   whole, so tool calls and their results stay paired. The dropped
+   questions are kept as a one-line note in front of the oldest kept
+   turn, with any system prompt from the first turn.
+
+Tokens are estimated at ~4 characters each, which is close enough for a
+budget.
+"""
+
+import os
+from dataclasses import replace
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    SystemPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+MEMORY_TOKENS = int(os.getenv("DBT_MCP_MEMORY_TOKENS", 6000))
+MEMORY_TOOL_CHARS = int(os.getenv("DBT_MCP_MEMORY_TOOL_CHARS", 1500))
+
+CHARS_PER_TOKEN = 4
+
+
+def _part_chars(part) -> int:
+    if isinstance(part, ToolReturnPart):
+        return len(part.model_response_str())
+    if isinstance(part, ToolCallPart):
+        return len(part.args_as_json_str())
+    content = getattr(part, "content", "")
+    return len(content) if isinstance(content, str) else len(str(content))
+
+
+def estimate_tokens(messages: list[ModelMessage]) -> int:
+    return sum(_part_chars(part) for m in messages for part in m.parts) // CHARS_PER_TOKEN
+
+
+def _question(turn: list[ModelMessage]) -> str:
+    for part in turn[0].parts:
+        if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+            return part.content
+    return ""
+
+
+def _elide_tool_results(turn: list[ModelMessage], max_chars: int) -> list[ModelMessage]:
+    compacted = []
+    for message in turn:
+        if isinstance(message, ModelRequest) and any(
+            isinstance(p, ToolReturnPart) and len(p.model_response_str()) > max_chars for p in message.parts
+        ):
+            parts = []
+            for p in message.parts:
+                if isinstance(p, ToolReturnPart):
+                    text = p.model_response_str()
+                    if len(text) > max_chars:
+                        p = replace(p, content=(
+                            f"{text[:max_chars]}\n... [{len(text) - max_chars} more characters elided from an "
+                            f"earlier turn; call {p.tool_name} again if you need the full result]"
+                        ))
+                parts.append(p)
+            message = replace(message, parts=parts)
+        compacted.append(message)
+    return compacted
+
+
+class ConversationMemory:
+    """Message history for one conversation, compacted to a token budget."""
+
+    # How many dropped questions the note in front of the history lists.
+    MAX_DROPPED_QUESTIONS = 20
+
+    def __init__(self, max_tokens: int = MEMORY_TOKENS, max_tool_chars: int = MEMORY_TOOL_CHARS):
+        self.max_tokens = max_tokens
+        self.max_tool_chars = max_tool_chars
+        self._turns: list[list[ModelMessage]] = []
+        self._sizes: list[int] = []
+        # The latest turn with its tool results cut, and its size, for when it doesn't fit intact
+        self._last_elided: list[ModelMessage] = []
+        self._last_elided_size = 0
+        self._system_parts: list[SystemPromptPart] = []
+        self._dropped: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def clear(self) -> None:
+        self._turns.clear()
+        self._sizes.clear()
+        self._last_elided = []
+        self._last_elided_size = 0
+        self._system_parts.clear()
+        self._dropped.clear()
+
+    def add(self, messages: list[ModelMessage]) -> None:
+        """Remember one finished turn, i.e. `result.new_messages()`."""
+        if not messages:
+            return
+        if not self._turns and isinstance(messages[0], ModelRequest):
+            self._system_parts = [p for p in messages[0].parts if isinstance(p, SystemPromptPart)]
+        if self._turns:
+            # The previous turn is no longer the latest: cut its tool results down once.
+            self._turns[-1] = self._last_elided
+            self._sizes[-1] = self._last_elided_size
+        self._turns.append(list(messages))
+        self._sizes.append(estimate_tokens(messages))
+        self._last_elided = _elide_tool_results(self._turns[-1], self.max_tool_chars)
+        self._last_elided_size = estimate_tokens(self._last_elided)
+
+        # Budget the history with the latest turn cut down too; history() keeps it intact if that fits
+        while len(self._turns) > 1 and sum(self._sizes[:-1]) + self._last_elided_size > self.max_tokens:
+            if question := _question(self._turns.pop(0)):
+                self._dropped.append(question)
+            self._sizes.pop(0)
+        del self._dropped[: -self.MAX_DROPPED_QUESTIONS]
+
+    def history(self) -> list[ModelMessage]:
+        """The remembered turns to pass as `message_history`, within the token budget where possible."""
+        if not self._turns:
+            return []
+        turns = self._turns
+        if sum(self._sizes) > self.max_tokens:
+            turns = [*turns[:-1], self._last_elided]
+        messages = [m for t in turns for m in t]
+        first = messages[0]
+        if isinstance(first, ModelRequest) and (self._dropped or self._system_parts):
+            kept = [p for p in first.parts if not isinstance(p, SystemPromptPart)]
+            prefix: list = list(self._system_parts)
+            if self._dropped:
+                prefix.append(UserPromptPart(
+                    "Earlier in this conversation I also asked: " + "; ".join(self._dropped)
+                ))
+            messages[0] = replace(first, parts=[*prefix, *kept])
+        return messages
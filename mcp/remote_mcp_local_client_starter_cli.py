@@ -3,6 +3,12 @@ Interactive CLI for dbt-mcp with Pydantic AI
 Simple command-line interface to ask questions about your dbt project
 """
 
+import time
+
+# Process start, for --timing
+STARTED = time.perf_counter()
+
+import argparse
 import asyncio
 import os
 from pathlib import Path
@@ -10,25 +16,33 @@ from dotenv import load_dotenv
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.mcp import MCPServerStreamableHTTP
 from pydantic_ai.messages import FunctionToolCallEvent
+from pydantic_ai.models import Model
 import httpx
 
+from bounded_sql import bounded
+from http_pool import build_http_client
+from startup import PhaseTimer, prewarmed, read_line, start_servers
+from tool_cache import cached
+from tool_pruning import pruned
+from tracing import traced, tracer
+
 BASE_DIR = Path(__file__).parent.parent
+IMPORTED = time.perf_counter()
 
-async def test_mcp_connection(url: str, headers: dict) -> bool:
-    """Test if the MCP server is accessible"""
+async def test_mcp_connection(client: httpx.AsyncClient, url: str) -> bool:
+    """Test if the MCP server is accessible, warming up the shared connection pool"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers, timeout=10.0)
-            print(f"✓ Server connection test: {response.status_code}")
-            print(f"Response headers: {response.content}")
-            return response.status_code < 500
+        response = await client.get(url, timeout=httpx.Timeout(10.0, connect=client.timeout.connect))
+        print(f"✓ Server connection test: {response.status_code} ({response.http_version})")
+        print(f"Response headers: {response.content}")
+        return response.status_code < 500
     except Exception as e:
         print(f"✗ Connection test failed: {e}")
         return False
 
-async def main():
-    """Start a conversation using PydanticAI with an HTTP MCP server."""
-    
+def load_remote_config() -> tuple[str, dict] | None:
+    """Read and validate the dbt platform settings; returns (url, headers), or None after printing what is wrong."""
+
     # Load environment variables with verification
     env_loaded = load_dotenv(BASE_DIR / ".env", override=True)
     starter_loaded = load_dotenv(BASE_DIR / ".env.starter", override=True)
@@ -71,35 +85,71 @@ async def main():
     print(f"  Prod Env ID: {prod_environment_id}")
     print(f"  Token: {'*' * 20}{token[-4:]}\n")
     
-    # Configure MCP server connection
-    mcp_server_url = f"https://{host}/api/ai/v1/mcp/"
+    # Configure MCP server connection; DBT_MCP_URL points at a stand-in server for local testing
+    mcp_server_url = os.getenv("DBT_MCP_URL") or f"https://{host}/api/ai/v1/mcp/"
     mcp_server_headers = {
         "Authorization": f"token {token}",
         "x-dbt-prod-environment-id": prod_environment_id,
     }
-    
-    # Test connection before proceeding
-    print("Testing MCP server connection...")
-    if not await test_mcp_connection(mcp_server_url, mcp_server_headers):
-        print("\nFailed to connect to MCP server. Please check:")
-        print("  1. Your DBT_TOKEN is valid")
-        print("  2. Your DBT_PROD_ENV_ID is correct")
-        print("  3. Your network allows access to", host)
-        return
-    
-    print("\nInitializing agent...")
+    return mcp_server_url, mcp_server_headers
+
+
+def build_agent(
+    mcp_server_url: str,
+    mcp_server_headers: dict,
+    http_client: httpx.AsyncClient | None = None,
+    model: Model | str | None = None,
+) -> Agent:
+    """Create an Agent talking to the hosted dbt MCP server over streamable HTTP, through a pooled client."""
     server = MCPServerStreamableHTTP(
         url=mcp_server_url,
-        headers=mcp_server_headers
+        http_client=http_client or build_http_client(mcp_server_headers),
     )
-    
-    # Use a valid OpenAI model
-    agent = Agent(
-        model=os.getenv("OPENAI_MODEL"),
-        toolsets=[server],
+    return Agent(
+        model=model or os.getenv("OPENAI_MODEL"),
+        toolsets=[pruned(traced(bounded(cached(prewarmed(server)))))],
         system_prompt="You are a helpful AI assistant with access to MCP tools for dbt.",
     )
+
+
+async def main(timing: bool = False):
+    """Start a conversation using PydanticAI with an HTTP MCP server."""
+    config = load_remote_config()
+    if config is None:
+        return
+    mcp_server_url, mcp_server_headers = config
+
+    # One connection pool for the health check and the MCP transport
+    http_client = build_http_client(mcp_server_headers)
+    try:
+        await converse(mcp_server_url, mcp_server_headers, http_client, timing)
+    finally:
+        await http_client.aclose()
+
+
+async def converse(mcp_server_url: str, mcp_server_headers: dict, http_client: httpx.AsyncClient, timing: bool = False):
+    """Health-check the server, then chat until the user quits."""
+    timer = PhaseTimer(STARTED)
+    timer.add("imports + .env", STARTED, IMPORTED)
+
+    # Test connection before proceeding, building the agent (and importing the model provider) meanwhile
+    print("Testing MCP server connection...")
+    started = time.perf_counter()
+    building = asyncio.create_task(asyncio.to_thread(build_agent, mcp_server_url, mcp_server_headers, http_client))
+    healthy = await test_mcp_connection(http_client, mcp_server_url)
+    timer.add("health check", started)
+    agent = await building
+    timer.add("build agent", started)
+    if not healthy:
+        print("\nFailed to connect to MCP server. Please check:")
+        print("  1. Your DBT_TOKEN is valid")
+        print("  2. Your DBT_PROD_ENV_ID is correct")
+        print("  3. Your network allows access to", httpx.URL(mcp_server_url).host)
+        return
     
+    # MCP handshake and tools/list run while the user types the first question
+    start_servers(agent, timer)
+
     print("\n" + "="*60)
     print("Starting conversation with PydanticAI + MCP server...")
     print("Type 'quit' to exit")
@@ -107,9 +157,11 @@ async def main():
     
     try:
         async with agent:
+            timer.mark("prompt ready")
+            first = True
             while True:
                 try:
-                    user_input = input("You: ").strip()
+                    user_input = (await read_line("You: ")).strip()
                     
                     if user_input.lower() in ["quit", "exit", "q"]:
                         print("Goodbye!")
@@ -127,13 +179,22 @@ async def main():
                                 print("Assistant: ", end="", flush=True)
                     
                     # Stream the response with real-time events
+                    asked = time.perf_counter()
                     print("Assistant: ", end="", flush=True)
-                    async with agent.run_stream(
-                        user_input, event_stream_handler=event_handler
-                    ) as result:
-                        async for text in result.stream_text(delta=True):
-                            print(text, end="", flush=True)
+                    with tracer().turn(user_input) as turn:
+                        chunks = []
+                        async with agent.run_stream(
+                            user_input, event_stream_handler=event_handler
+                        ) as result:
+                            async for text in result.stream_text(delta=True):
+                                chunks.append(text)
+                                print(text, end="", flush=True)
+                        turn.done(result, answer="".join(chunks))
                     print()  # New line after response
+                    if timing and first:
+                        timer.add("first answer", asked)
+                        print(timer.report() + "\n")
+                    first = False
                 
                 except KeyboardInterrupt:
                     print("\nGoodbye!")
@@ -150,4 +211,9 @@ async def main():
         print("  3. Network connectivity issues")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Chat with the hosted dbt MCP server.")
+    parser.add_argument("--timing", action="store_true", help="Print a startup phase breakdown after the first answer")
+    try:
+        asyncio.run(main(parser.parse_args().timing))
+    except KeyboardInterrupt:
+        print("\nGoodbye!")
\ No newline at end of file
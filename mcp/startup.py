@@ -0,0 +1,337 @@
+"""
+Faster time to first answer for the dbt assistant.
+
+Starting up used to be strictly sequential: resolve dbt-mcp, build the
+agent (importing the model provider), start dbt-mcp and do the MCP
+handshake, then, on the first question, list the tools. Most of that
+time is dbt-mcp booting in its own process, so it can overlap with
+everything else:
+
+    server = prewarmed(MCPServerStdio(*resolve_dbt_mcp(os.getenv("DBT_MCP_BIN"))))
+    server.startup.start()                                     # spawn + handshake + tools/list
+    agent = await asyncio.to_thread(build_agent, server)       # meanwhile
+
+PrewarmedToolset starts the server in a task of its own and answers
+get_tools from the live tool list once it is known. Before that it
+answers from tool schemas cached on disk by dbt-mcp version, so the first
+model request can go out while dbt-mcp is still starting; tool calls wait
+for the server. The tool list is kept for the session instead of being
+fetched again on every model request.
+
+The resolved dbt-mcp command and the tool schemas live in
+~/.cache/dbt-mcp-assistant/startup.json (DBT_MCP_STARTUP_CACHE_DIR to move
+it). Set DBT_MCP_PREWARM=0 to turn all of this off.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.mcp import MCPServer, MCPServerStdio, MCPServerStreamableHTTP
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import AbstractToolset, CombinedToolset, WrapperToolset
+from pydantic_ai.toolsets.abstract import ToolsetTool
+
+CACHE_DIR = Path(os.getenv("DBT_MCP_STARTUP_CACHE_DIR", Path.home() / ".cache" / "dbt-mcp-assistant"))
+# Tool lists kept for this many dbt-mcp versions
+MAX_CACHED_VERSIONS = 5
+
+
+class PhaseTimer:
+    """Start/end offsets of (possibly overlapping) startup phases, from process start."""
+
+    def __init__(self, started: float | None = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.spans: list[tuple[str, float, float]] = []
+
+    def add(self, name: str, start: float, end: float | None = None) -> None:
+        end = time.perf_counter() if end is None else end
+        self.spans.append((name, start - self.started, end - self.started))
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start)
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    def report(self) -> str:
+        lines = [f"{'phase':<26}{'start':>8}{'end':>8}{'took':>8}"]
+        for name, start, end in sorted(self.spans, key=lambda s: s[1]):
+            lines.append(f"{name:<26}{start:>7.2f}s{end:>7.2f}s{end - start:>7.2f}s")
+        return "\n".join(lines)
+
+
+# ---------- On-disk cache ----------
+def _cache_path() -> Path:
+    return CACHE_DIR / "startup.json"
+
+
+def _load_cache() -> dict:
+    try:
+        return json.loads(_cache_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(update) -> None:
+    """Apply `update` to the cache file and replace it atomically (several processes may share it)."""
+    data = _load_cache()
+    update(data)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=CACHE_DIR, delete=False, suffix=".tmp") as f:
+            json.dump(data, f)
+        os.replace(f.name, _cache_path())
+    except OSError:
+        pass
+
+
+def resolve_dbt_mcp(explicit: str | None = None) -> tuple[str, list[str], str]:
+    """
+    The (command, args, how) to launch dbt-mcp with, in order of preference:
+    `explicit` (DBT_MCP_BIN), the console script next to this Python, dbt-mcp
+    on PATH, then `python -m dbt_mcp.main`.
+
+    The answer is cached on disk for the same inputs and reused while the
+    command still exists, so the venv and PATH are not probed on every start.
+    """
+    key = json.dumps([explicit, sys.executable, os.getenv("PATH", "")])
+    hit = _load_cache().get("commands", {}).get(key)
+    if hit and Path(hit["command"]).exists():
+        return hit["command"], hit["args"], hit["how"]
+
+    venv_dbt_mcp = Path(sys.executable).parent / ("dbt-mcp.exe" if os.name == "nt" else "dbt-mcp")
+    if explicit and Path(explicit).exists():
+        command, args, how = explicit, [], "DBT_MCP_BIN"
+    elif venv_dbt_mcp.exists():
+        command, args, how = str(venv_dbt_mcp), [], "venv binary"
+    elif which := shutil.which("dbt-mcp"):
+        command, args, how = which, [], "PATH"
+    else:
+        # 'dbt_mcp' has no __main__, so use 'dbt_mcp.main'
+        command, args, how = sys.executable, ["-m", "dbt_mcp.main"], "module"
+
+    _save_cache(lambda data: data.setdefault("commands", {}).__setitem__(
+        key, {"command": command, "args": args, "how": how}
+    ))
+    return command, args, how
+
+
+def server_version_key(server: MCPServer) -> str:
+    """
+    What cached tool schemas are keyed by: the installed dbt-mcp version plus
+    the launch command and a hash of its environment (DISABLE_* switch tool
+    groups off).
+    """
+    if isinstance(server, MCPServerStreamableHTTP):
+        return f"http:{server.url}"
+    try:
+        version = metadata.version("dbt-mcp")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    if isinstance(server, MCPServerStdio):
+        try:
+            # Reinstalling rewrites the console script, so its mtime changes with the version
+            stamp = Path(server.command).stat().st_mtime_ns
+        except OSError:
+            stamp = 0
+        env = hashlib.sha256(json.dumps(server.env or {}, sort_keys=True).encode()).hexdigest()[:16]
+        return f"{version}:{server.command}:{' '.join(server.args)}:{stamp}:{env}"
+    return f"{version}:{type(server).__name__}"
+
+
+# ---------- Background start ----------
+class ServerStartup:
+    """
+    Starts an MCP server in a task of its own and lists its tools.
+
+    Shared by every copy of the PrewarmedToolset wrapping the server. The
+    owner task is the only one that enters and exits the server, which
+    anyio requires.
+    """
+
+    def __init__(self, server: MCPServer, timer: PhaseTimer | None = None):
+        self.server = server
+        self.timer = timer
+        self.key = server_version_key(server)
+        self.cached_tools: list[dict] | None = _load_cache().get("tools", {}).get(self.key)
+        self.live_tools: list[dict] | None = None
+        self.error: BaseException | None = None
+        self.holders = 0
+        self._task: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None
+        self._stop: asyncio.Event | None = None
+
+    def start(self) -> None:
+        """Begin starting the server now, if not already started; must be called on the running loop."""
+        if self._task is None:
+            self.error = None
+            self._ready = asyncio.Event()
+            self._stop = asyncio.Event()
+            self._task = asyncio.create_task(self._own(), name="mcp-server-startup")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stop.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self.live_tools = None
+
+    async def _own(self) -> None:
+        try:
+            started = time.perf_counter()
+            async with self.server:
+                if self.timer:
+                    self.timer.add("dbt-mcp start + handshake", started)
+                listed = time.perf_counter()
+                tools = await self.server.list_tools()
+                if self.timer:
+                    self.timer.add("dbt-mcp tools/list", listed)
+                self.live_tools = [
+                    {"name": t.name, "description": t.description, "inputSchema": t.inputSchema} for t in tools
+                ]
+                if self.live_tools != self.cached_tools:
+                    self._remember(self.live_tools)
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self.error = e
+            # Let the next start() try again
+            self._task = None
+        finally:
+            self._ready.set()
+
+    def _remember(self, tools: list[dict]) -> None:
+        def update(data: dict) -> None:
+            cached = data.setdefault("tools", {})
+            cached.pop(self.key, None)
+            cached[self.key] = tools
+            for stale in list(cached)[:-MAX_CACHED_VERSIONS]:
+                del cached[stale]
+        _save_cache(update)
+
+    async def ready(self) -> None:
+        """Wait until the server is up; raises the startup error if it failed."""
+        self.start()
+        await self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    async def tools(self) -> list[dict]:
+        """The live tool list, or the cached one while the server is still starting."""
+        self.start()
+        if self.live_tools is not None:
+            return self.live_tools
+        if self.cached_tools is not None and not self._ready.is_set():
+            return self.cached_tools
+        await self.ready()
+        return self.live_tools
+
+
+@dataclass
+class PrewarmedToolset(WrapperToolset):
+    """Wrap an MCP server so it starts in the background and its tool list is known up front."""
+
+    startup: ServerStartup = field(default=None)
+
+    def __post_init__(self):
+        if self.startup is None:
+            self.startup = ServerStartup(self.wrapped)
+
+    async def __aenter__(self):
+        self.startup.start()
+        self.startup.holders += 1
+        return self
+
+    async def __aexit__(self, *args: Any) -> bool | None:
+        self.startup.holders -= 1
+        if self.startup.holders == 0:
+            await self.startup.stop()
+        return None
+
+    async def get_tools(self, ctx: RunContext[Any]) -> dict[str, ToolsetTool[Any]]:
+        server = self.wrapped
+        prefix = f"{server.tool_prefix}_" if server.tool_prefix else ""
+        return {
+            prefix + t["name"]: server.tool_for_tool_def(
+                ToolDefinition(name=prefix + t["name"], description=t["description"],
+                               parameters_json_schema=t["inputSchema"])
+            )
+            for t in await self.startup.tools()
+        }
+
+    async def call_tool(
+        self, name: str, tool_args: dict[str, Any], ctx: RunContext[Any], tool: ToolsetTool[Any]
+    ) -> Any:
+        await self.startup.ready()
+        return await super().call_tool(name, tool_args, ctx, tool)
+
+
+def prewarmed(server: AbstractToolset, timer: PhaseTimer | None = None) -> AbstractToolset:
+    """Wrap an MCP server in a PrewarmedToolset, unless it already is one or DBT_MCP_PREWARM=0."""
+    if isinstance(server, PrewarmedToolset) or not isinstance(server, MCPServer):
+        return server
+    if os.getenv("DBT_MCP_PREWARM", "1") == "0":
+        return server
+    return PrewarmedToolset(server, ServerStartup(server, timer))
+
+
+def startups(toolsets) -> list[ServerStartup]:
+    """The ServerStartup of every PrewarmedToolset in `toolsets`, however deeply wrapped."""
+    found, stack = [], list(toolsets)
+    # apply() only visits leaf toolsets, so walk the wrappers by hand
+    while stack:
+        toolset = stack.pop()
+        if isinstance(toolset, PrewarmedToolset):
+            found.append(toolset.startup)
+        elif isinstance(toolset, WrapperToolset):
+            stack.append(toolset.wrapped)
+        elif isinstance(toolset, CombinedToolset):
+            stack.extend(toolset.toolsets)
+    return found
+
+
+def start_servers(agent, timer: PhaseTimer | None = None) -> None:
+    """Start every prewarmed MCP server behind `agent` now, reporting its phases to `timer`."""
+    for startup in startups(agent.toolsets):
+        startup.timer = timer or startup.timer
+        startup.start()
+
+
+async def read_line(prompt: str) -> str:
+    """input() on a daemon thread, so servers keep starting (and the loop keeps running) while the user types."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result: str | None, error: BaseException | None) -> None:
+        if not future.done():
+            future.set_exception(error) if error is not None else future.set_result(result)
+
+    def read() -> None:
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, None, e)
+        else:
+            loop.call_soon_threadsafe(settle, line, None)
+
+    threading.Thread(target=read, name="cli-input", daemon=True).start()
+    return await future
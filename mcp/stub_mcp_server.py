@@ -0,0 +1,97 @@
+"""
+Stub dbt MCP server for offline load tests.
+
+Serves tools named like dbt-mcp's, each answering after a configurable
+latency with a payload of a configurable size, so the client side (agent,
+toolset wrappers, transports) can be exercised without dbt or a warehouse:
+
+    python stub_mcp_server.py                                    # stdio
+    python stub_mcp_server.py --transport streamable-http --port 8765
+    python stub_mcp_server.py --spec tools.json --jitter 0.2
+
+A spec file maps tool names to {"latency": seconds, "payload": bytes} and
+replaces the default tool set. Tools accept any arguments.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import TextContent, Tool
+
+# Rough latency and result size of the dbt-mcp tools the assistant calls most
+DEFAULT_TOOLS = {
+    "list_models": {"latency": 0.4, "payload": 24_000},
+    "get_model_details": {"latency": 0.2, "payload": 4_000},
+    "get_model_parents": {"latency": 0.2, "payload": 1_500},
+    "get_model_children": {"latency": 0.2, "payload": 1_500},
+    "get_all_sources": {"latency": 0.3, "payload": 8_000},
+    "list_metrics": {"latency": 0.3, "payload": 3_000},
+    "show": {"latency": 1.5, "payload": 2_000},
+    "build": {"latency": 5.0, "payload": 6_000},
+}
+
+
+def payload(name: str, size: int) -> str:
+    """JSON-lines text of about `size` bytes."""
+    lines, total, i = [], 0, 0
+    while total < size:
+        line = json.dumps({"tool": name, "name": f"model_{i}", "description": f"Stub row {i} returned by {name}"})
+        lines.append(line)
+        total += len(line) + 1
+        i += 1
+    return "\n".join(lines)[:size]
+
+
+class StubServer(FastMCP):
+    """FastMCP server whose tools come from a latency/payload spec instead of functions."""
+
+    def __init__(self, tools: dict[str, dict] | None = None, jitter: float = 0.0, **settings: Any):
+        super().__init__("dbt-stub", **settings)
+        self.tools = tools or DEFAULT_TOOLS
+        self.jitter = jitter
+        self._payloads = {name: payload(name, int(spec.get("payload", 0))) for name, spec in self.tools.items()}
+
+    async def list_tools(self) -> list[Tool]:
+        return [
+            Tool(
+                name=name,
+                description=f"Stub of the dbt-mcp {name} tool.",
+                inputSchema={"type": "object", "properties": {}, "additionalProperties": True},
+            )
+            for name in self.tools
+        ]
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> list[TextContent]:
+        if name not in self.tools:
+            raise ToolError(f"Unknown tool: {name}")
+        latency = float(self.tools[name].get("latency", 0.0))
+        if self.jitter:
+            latency *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        await asyncio.sleep(latency)
+        return [TextContent(type="text", text=self._payloads[name])]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub dbt MCP server with scripted tool latency and payload size.")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--spec", help='JSON file of {"tool": {"latency": s, "payload": bytes}}')
+    parser.add_argument("--jitter", type=float, default=0.0, help="Randomize latency by ±this fraction")
+    args = parser.parse_args()
+
+    tools = None
+    if args.spec:
+        with open(args.spec) as f:
+            tools = json.load(f)
+    server = StubServer(tools, args.jitter, host=args.host, port=args.port, log_level="WARNING")
+    server.run(args.transport)
+
+
+if __name__ == "__main__":
+    main()
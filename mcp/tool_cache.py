@@ -0,0 +1,196 @@
+"""
+Result cache for dbt-mcp tool calls.
+
+Metadata questions ("list all models", "what depends on X") make the agent
+call the same dbt-mcp tools over and over, and every call shells out to dbt.
+CachedToolset wraps an MCP server toolset and memoizes read-only calls by
+tool name and arguments:
+
+    cache = ToolResultCache(project_dir=os.getenv("DBT_PROJECT_DIR"))
+    dbt_server = CachedToolset(MCPServerStdio(...), cache=cache)
+    agent = Agent(model, toolsets=[dbt_server])
+
+Only tools in CACHEABLE_TOOLS, whose answers depend on nothing but the
+project, are cached; anything else, including tools added to dbt-mcp
+later, goes to the server every time. Entries expire after a TTL and the
+least recently used ones are evicted past a size limit. When a project
+directory is given, the cache is also dropped whenever
+target/manifest.json or any project file changes. Tools that change the
+warehouse or the project (run, build, seed, ...) clear it afterwards.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.toolsets import AbstractToolset, WrapperToolset
+from pydantic_ai.toolsets.abstract import ToolsetTool
+
+CACHE_TTL = float(os.getenv("DBT_MCP_CACHE_TTL", 300))
+CACHE_SIZE = int(os.getenv("DBT_MCP_CACHE_SIZE", 256))
+
+# Read-only dbt-mcp tools whose results depend only on the project. The only ones cached.
+CACHEABLE_TOOLS = frozenset({
+    "list",
+    "list_models",
+    "get_all_models",
+    "get_mart_models",
+    "get_model_details",
+    "get_model_parents",
+    "get_model_children",
+    "get_all_sources",
+    "get_exposures",
+    "get_exposure_details",
+    "list_metrics",
+    "get_dimensions",
+    "get_entities",
+    "list_saved_queries",
+    "get_metrics_compiled_sql",
+})
+
+# Tools that change the warehouse, the project or its runs. They clear the cache afterwards.
+STATE_CHANGING_TOOLS = frozenset({
+    "build",
+    "run",
+    "test",
+    "seed",
+    "snapshot",
+    "parse",
+    "trigger_job_run",
+    "cancel_job_run",
+    "retry_job_run",
+})
+
+# Read-only tools answering from warehouse data, which changes without the project changing.
+DATA_TOOLS = frozenset({"show", "execute_sql", "query_metrics", "run_sql"})
+
+# Project paths whose changes make cached metadata stale.
+PROJECT_PATHS = ("dbt_project.yml", "packages.yml", "models", "macros", "seeds", "snapshots", "tests", "analyses")
+
+# Minimum seconds between two scans of the project files.
+FINGERPRINT_INTERVAL = 1.0
+
+
+def project_fingerprint(project_dir: str | Path) -> tuple:
+    """Cheap change marker for a dbt project: stat of the manifest plus newest mtime/file count of the sources."""
+    project_dir = Path(project_dir)
+    manifest = project_dir / "target" / "manifest.json"
+    try:
+        st = manifest.stat()
+        manifest_key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        manifest_key = None
+
+    newest, count = 0, 0
+    for name in PROJECT_PATHS:
+        path = project_dir / name
+        if path.is_file():
+            newest, count = max(newest, path.stat().st_mtime_ns), count + 1
+            continue
+        for root, dirs, files in os.walk(path):
+            newest = max(newest, os.stat(root).st_mtime_ns)
+            for f in files:
+                try:
+                    newest = max(newest, os.stat(os.path.join(root, f)).st_mtime_ns)
+                except OSError:
+                    continue
+                count += 1
+    return manifest_key, newest, count
+
+
+class ToolResultCache:
+    """LRU + TTL store of tool results, dropped when the dbt project changes."""
+
+    def __init__(
+        self,
+        project_dir: str | Path | None = None,
+        ttl: float = CACHE_TTL,
+        max_entries: int = CACHE_SIZE,
+    ):
+        self.project_dir = project_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._fingerprint = project_fingerprint(project_dir) if project_dir else None
+        self._checked_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _check_project(self) -> None:
+        """Drop every entry if the manifest or project files changed since the last check."""
+        if not self.project_dir:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < FINGERPRINT_INTERVAL:
+            return
+        self._checked_at = now
+        fingerprint = project_fingerprint(self.project_dir)
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self.clear()
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        self._check_project()
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key: tuple, result: Any) -> None:
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+@dataclass
+class CachedToolset(WrapperToolset):
+    """
+    Wrap a toolset and serve repeated read-only tool calls from `cache`.
+
+    The agent copies its toolsets for every run, so all state lives on the
+    shared ToolResultCache rather than on the wrapper.
+    """
+
+    cache: ToolResultCache = field(default_factory=ToolResultCache)
+    cacheable_tools: frozenset[str] = CACHEABLE_TOOLS
+    state_changing_tools: frozenset[str] = STATE_CHANGING_TOOLS
+
+    async def call_tool(
+        self, name: str, tool_args: dict[str, Any], ctx: RunContext[Any], tool: ToolsetTool[Any]
+    ) -> Any:
+        if name in self.state_changing_tools:
+            try:
+                return await super().call_tool(name, tool_args, ctx, tool)
+            finally:
+                self.cache.clear()
+        if name not in self.cacheable_tools:
+            return await super().call_tool(name, tool_args, ctx, tool)
+
+        key = (name, json.dumps(tool_args, sort_keys=True, default=str))
+        hit, result = self.cache.get(key)
+        if not hit:
+            result = await super().call_tool(name, tool_args, ctx, tool)
+            self.cache.put(key, result)
+        return result
+
+
+def cached(toolset: AbstractToolset, project_dir: str | Path | None = None) -> AbstractToolset:
+    """Wrap `toolset` in a CachedToolset unless DBT_MCP_CACHE=0."""
+    if os.getenv("DBT_MCP_CACHE", "1") == "0":
+        return toolset
+    return CachedToolset(toolset, cache=ToolResultCache(project_dir))
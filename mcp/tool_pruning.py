@@ -0,0 +1,161 @@
+"""
+Per-question pruning of the dbt-mcp tool list.
+
+Every run sends all dbt-mcp tool schemas to the model; the DISABLE_*
+variables can only switch whole groups off for good. pruned() wraps the
+MCP toolset so each run only offers the groups the question looks like it
+needs, picked by keyword matching on the prompt:
+
+    toolsets = [pruned(dbt_server)]
+
+Tools are grouped by name (discovery, semantic layer, SQL, dbt CLI, admin
+API, codegen); a tool can sit in several groups, so the dbt CLI's `list`
+and `show` also answer discovery and SQL questions when no Discovery API
+is configured. A question that matches no group gets every tool. The
+model also gets a `show_all_tools` tool: once it calls it, the rest of
+that run sees the full list, so a wrong guess costs one extra step rather
+than a wrong answer. Set DBT_MCP_TOOL_PRUNING=0 to turn pruning off.
+
+`python tool_pruning.py` checks that the shipped example prompts keep the
+tools they need.
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelRequest, ModelResponse, ToolCallPart, UserPromptPart
+from pydantic_ai.toolsets import AbstractToolset, CombinedToolset, FunctionToolset, WrapperToolset
+from pydantic_ai.toolsets.abstract import ToolsetTool
+
+FALLBACK_TOOL = "show_all_tools"
+
+DBT_CLI_TOOLS = frozenset({"build", "compile", "docs", "list", "parse", "run", "test", "show", "seed", "snapshot"})
+
+# dbt CLI tools that are also the only local answer to another group's questions
+SHARED_TOOLS = {"list": {"discovery"}, "show": {"sql"}}
+
+# Tool group -> pattern matched against tool names. First match wins.
+TOOL_GROUPS = {
+    "semantic_layer": re.compile(r"metric|dimension|entit|saved_quer|semantic"),
+    "sql": re.compile(r"sql"),
+    "admin_api": re.compile(r"job|artifact|project_details|environment|account"),
+    "codegen": re.compile(r"^generate_"),
+    "discovery": re.compile(r"model|source|exposure|lineage|parent|child|health|node|macro|seed|snapshot|test"),
+}
+
+# Tool group -> words in a question that suggest it. Matched on word starts.
+QUESTION_KEYWORDS = {
+    "semantic_layer": ("metric", "measure", "dimension", "kpi", "semantic", "entit", "saved quer", "time grain"),
+    "sql": ("sql", "query", "select ", "rows", "how many", "count", "sample", "top ", "average", "sum of", "values"),
+    "dbt_cli": ("build", "run", "test", "compile", "parse", "seed", "snapshot", "dry-run", "dry run", "fail",
+                "error", "refresh", "selector", "execute"),
+    "admin_api": ("job", "deploy", "schedul", "artifact", "environment", "cloud", "run history", "last run"),
+    "codegen": ("generate", "stub", "scaffold", "boilerplate", "yaml", "yml", "new model", "staging model"),
+    "discovery": ("model", "source", "lineage", "depend", "upstream", "downstream", "parent", "child", "exposure",
+                  "column", "mart", "health", "describe", "document", "list", "ref(", "project", "node", "macro"),
+}
+
+
+# Shipped example prompts (CLI banner, app suggestions, load test) -> tools they must keep
+EXAMPLE_TOOLS = {
+    "List all models in my project": {"list"},
+    "Show me sources and their downstream models": {"list", "get_all_sources"},
+    "What tests are failing and why?": {"test", "build"},
+    "Generate a model stub for a new incremental table": {"generate_model_yaml"},
+    "Which models depend on {{ ref('my_model') }}?": {"list", "get_model_children"},
+    "Run a dry-run build for the staging layer": {"build"},
+    "How many transactions per store?": {"show"},
+    "How many rows are in fct_orders? Run a quick SQL count": {"show"},
+}
+
+
+def tool_groups(name: str) -> set[str]:
+    """Groups a tool belongs to; empty when it matches none (always offered)."""
+    if name in DBT_CLI_TOOLS:
+        return {"dbt_cli", *SHARED_TOOLS.get(name, ())}
+    for group, pattern in TOOL_GROUPS.items():
+        if pattern.search(name):
+            return {group}
+    return set()
+
+
+def offered(name: str, groups: set[str]) -> bool:
+    """Whether a tool is offered to a question classified as `groups`."""
+    tool = tool_groups(name)
+    return not groups or not tool or bool(tool & groups)
+
+
+def classify_question(question: str) -> set[str]:
+    """Tool groups a question seems to need; empty when nothing matched."""
+    text = question.lower()
+    return {
+        group
+        for group, words in QUESTION_KEYWORDS.items()
+        if any(re.search(r"\b" + re.escape(word), text) for word in words)
+    }
+
+
+def _prompt_text(prompt: Any) -> str:
+    if isinstance(prompt, str):
+        return prompt
+    return " ".join(p for p in prompt or () if isinstance(p, str))
+
+
+def _asked_for_all_tools(messages: list) -> bool:
+    """Whether the model called show_all_tools since the latest user prompt."""
+    for message in reversed(messages):
+        if isinstance(message, ModelResponse) and any(
+            isinstance(p, ToolCallPart) and p.tool_name == FALLBACK_TOOL for p in message.parts
+        ):
+            return True
+        if isinstance(message, ModelRequest) and any(isinstance(p, UserPromptPart) for p in message.parts):
+            return False
+    return False
+
+
+@dataclass
+class PrunedToolset(WrapperToolset):
+    """Offer only the wrapped tools whose group matches the run's prompt."""
+
+    async def get_tools(self, ctx: RunContext[Any]) -> dict[str, ToolsetTool[Any]]:
+        tools = await super().get_tools(ctx)
+        groups = classify_question(_prompt_text(ctx.prompt))
+        if not groups or _asked_for_all_tools(ctx.messages):
+            return tools
+        return {name: tool for name, tool in tools.items() if offered(name, groups)}
+
+
+def show_all_tools() -> str:
+    """Make every dbt tool available. Call this if none of the tools you can see fit the question."""
+    return "All dbt tools are now available."
+
+
+def pruned(toolset: AbstractToolset) -> AbstractToolset:
+    """Wrap `toolset` so each run only sees the tools its question needs, unless DBT_MCP_TOOL_PRUNING=0."""
+    if os.getenv("DBT_MCP_TOOL_PRUNING", "1") == "0":
+        return toolset
+    return CombinedToolset([PrunedToolset(toolset), FunctionToolset([show_all_tools])])
+
+
+def check_examples() -> list[str]:
+    """Example prompts that would lose a tool they need, with the tools lost."""
+    failures = []
+    for question, needed in EXAMPLE_TOOLS.items():
+        groups = classify_question(question)
+        missing = sorted(name for name in needed if not offered(name, groups))
+        if missing:
+            failures.append(f"{question!r} ({', '.join(sorted(groups))}) prunes {', '.join(missing)}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_examples()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ {len(EXAMPLE_TOOLS)} example prompts keep their tools")
@@ -0,0 +1,240 @@
+"""
+Opt-in per-turn and per-tool tracing to a rotating JSONL file.
+
+Set DBT_MCP_TRACE=1 (or a file path) and the CLIs, the batch runner and the
+Streamlit agent write one JSON line per tool call and one per turn:
+
+    {"type": "tool", "turn": "3f2a...", "tool": "get_model_details", "seconds": 1.84,
+     "args_bytes": 31, "result_bytes": 5120, "error": null, "ts": "..."}
+    {"type": "turn", "turn": "3f2a...", "seconds": 6.2, "question_chars": 42, "answer_chars": 910,
+     "requests": 3, "input_tokens": 8123, "output_tokens": 402, "tool_calls": 2, "error": null, "ts": "..."}
+
+Wiring is two calls: wrap toolsets with traced() and run each question
+inside `with tracer().turn(question) as turn:`, calling `turn.done(result)`
+with the run result. Both are no-ops when tracing is off.
+
+Files rotate at DBT_MCP_TRACE_MAX_BYTES (default 10 MB) keeping
+DBT_MCP_TRACE_BACKUPS (default 5) old files. To see which tools dominate
+latency and payload size:
+
+    python tracing.py summarize [logs/trace.jsonl]
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import os
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.toolsets import AbstractToolset, WrapperToolset
+from pydantic_ai.toolsets.abstract import ToolsetTool
+
+DEFAULT_TRACE_FILE = Path(__file__).parent / "logs" / "trace.jsonl"
+
+_current_turn: contextvars.ContextVar["Turn | None"] = contextvars.ContextVar("dbt_mcp_turn", default=None)
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+
+@dataclass
+class Turn:
+    question: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started: float = field(default_factory=time.perf_counter)
+    tool_calls: int = 0
+    usage: Any = None
+    answer: Any = None
+
+    def done(self, result: Any, answer: Any = None) -> None:
+        """Record the run result's token usage and answer (pass `answer` for streamed runs)."""
+        self.usage = result.usage()
+        self.answer = result.output if answer is None else answer
+
+
+class Tracer:
+    """Writes tool and turn records as JSON lines; every method is a no-op when disabled."""
+
+    def __init__(self, path: str | Path | None = None, max_bytes: int = 10_000_000, backups: int = 5):
+        self.path = Path(path) if path else None
+        self._logger = None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._logger = logging.getLogger(f"dbt_mcp.trace.{self.path}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            if not self._logger.handlers:
+                handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backups)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self._logger.addHandler(handler)
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        setting = os.getenv("DBT_MCP_TRACE", "")
+        if setting in ("", "0"):
+            return cls()
+        return cls(
+            DEFAULT_TRACE_FILE if setting == "1" else setting,
+            max_bytes=int(os.getenv("DBT_MCP_TRACE_MAX_BYTES", 10_000_000)),
+            backups=int(os.getenv("DBT_MCP_TRACE_BACKUPS", 5)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._logger is not None
+
+    def write(self, record: dict) -> None:
+        if self._logger is not None:
+            record["ts"] = datetime.now(timezone.utc).isoformat()
+            self._logger.info(json.dumps(record, default=str))
+
+    @contextmanager
+    def turn(self, question: str):
+        """Time one question; tool calls made inside are tagged with the turn id."""
+        turn = Turn(question)
+        token = _current_turn.set(turn)
+        error = None
+        try:
+            yield turn
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_turn.reset(token)
+            if self.enabled:
+                self.write(self._turn_record(turn, error))
+
+    def _turn_record(self, turn: Turn, error: str | None) -> dict:
+        record = {
+            "type": "turn",
+            "turn": turn.id,
+            "seconds": round(time.perf_counter() - turn.started, 4),
+            "question_chars": len(turn.question),
+            "tool_calls": turn.tool_calls,
+            "error": error,
+        }
+        if turn.usage is not None:
+            record.update(
+                answer_chars=_size(turn.answer),
+                requests=turn.usage.requests,
+                input_tokens=turn.usage.request_tokens,
+                output_tokens=turn.usage.response_tokens,
+            )
+        return record
+
+
+_tracer: Tracer | None = None
+
+
+def tracer() -> Tracer:
+    """The process-wide tracer configured from DBT_MCP_TRACE."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer.from_env()
+    return _tracer
+
+
+@dataclass
+class TracedToolset(WrapperToolset):
+    """Record wall time and payload sizes of every tool call made through the wrapped toolset."""
+
+    tracer: Tracer = field(default_factory=tracer)
+
+    async def call_tool(
+        self, name: str, tool_args: dict[str, Any], ctx: RunContext[Any], tool: ToolsetTool[Any]
+    ) -> Any:
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.tool_calls += 1
+        record = {"type": "tool", "turn": turn.id if turn else None, "tool": name, "args_bytes": _size(tool_args)}
+        started = time.perf_counter()
+        try:
+            result = await super().call_tool(name, tool_args, ctx, tool)
+        except BaseException as e:
+            record.update(seconds=round(time.perf_counter() - started, 4), result_bytes=0,
+                          error=f"{type(e).__name__}: {e}")
+            self.tracer.write(record)
+            raise
+        record.update(seconds=round(time.perf_counter() - started, 4), result_bytes=_size(result), error=None)
+        self.tracer.write(record)
+        return result
+
+
+def traced(toolset: AbstractToolset) -> AbstractToolset:
+    """Wrap `toolset` in a TracedToolset when tracing is enabled."""
+    return TracedToolset(toolset) if tracer().enabled else toolset
+
+
+# ---------- Summarizer ----------
+def read_records(path: str | Path) -> list[dict]:
+    """Records from `path` and its rotated backups (path.1, path.2, ...), oldest first."""
+    path = Path(path)
+    backups = [p for p in path.parent.glob(path.name + ".*") if p.suffix[1:].isdigit()]
+    files = sorted(backups, key=lambda p: -int(p.suffix[1:]))
+    records = []
+    for f in [*files, path]:
+        if f.exists():
+            records.extend(json.loads(line) for line in f.read_text().splitlines() if line.strip())
+    return records
+
+
+def percentiles(values: list[float]) -> tuple[float, float, float]:
+    if len(values) < 2:
+        v = values[0] if values else 0.0
+        return v, v, v
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def summarize(records: list[dict]) -> str:
+    tools: dict[str, list[dict]] = {}
+    for r in records:
+        if r.get("type") == "tool":
+            tools.setdefault(r["tool"], []).append(r)
+    turns = [r for r in records if r.get("type") == "turn"]
+
+    header = f"{'tool':<32}{'calls':>7}{'errors':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'total s':>10}{'avg result B':>14}"
+    lines = [header, "-" * len(header)]
+    by_total = sorted(tools.items(), key=lambda item: -sum(r["seconds"] for r in item[1]))
+    for name, calls in by_total:
+        p50, p95, p99 = percentiles([r["seconds"] for r in calls])
+        errors = sum(1 for r in calls if r.get("error"))
+        total = sum(r["seconds"] for r in calls)
+        avg_result = sum(r["result_bytes"] for r in calls) / len(calls)
+        lines.append(
+            f"{name[:31]:<32}{len(calls):>7}{errors:>8}{p50:>9.3f}{p95:>9.3f}{p99:>9.3f}{total:>10.2f}{avg_result:>14.0f}"
+        )
+
+    if turns:
+        p50, p95, p99 = percentiles([r["seconds"] for r in turns])
+        input_tokens = sum(r.get("input_tokens") or 0 for r in turns)
+        output_tokens = sum(r.get("output_tokens") or 0 for r in turns)
+        lines += [
+            "",
+            f"turns: {len(turns)}  p50 {p50:.2f}s  p95 {p95:.2f}s  p99 {p99:.2f}s",
+            f"tokens: {input_tokens} in / {output_tokens} out "
+            f"({input_tokens / len(turns):.0f} / {output_tokens / len(turns):.0f} per turn)",
+        ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize dbt assistant trace files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summarize", help="Per-tool latency percentiles and payload sizes")
+    summary.add_argument("path", nargs="?", default=str(DEFAULT_TRACE_FILE), help="Trace file (default: logs/trace.jsonl)")
+    args = parser.parse_args()
+    print(summarize(read_records(args.path)))
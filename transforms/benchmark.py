@@ -0,0 +1,223 @@
+"""
+Benchmark model build times across dataset scale factors.
+
+For each scale factor this generates data with seeds/fake_datasets.py, loads
+it into the target database, runs `dbt build --full-refresh` and reads the
+per-node execution time and rows affected from target/run_results.json.
+Results are written as JSON that can be diffed (or passed to --compare)
+between branches, and nodes whose build time grows faster than linearly
+with the data are flagged.
+
+    python benchmark.py --target local --scales 1 4 16
+    python benchmark.py --target dev --scales 1 4 16 --sslmode disable --compare main.json
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent
+SEEDS_DIR = PROJECT_DIR / "seeds"
+
+# Nodes faster than this at the largest scale are too noisy to flag.
+MIN_FLAG_SECONDS = 0.5
+# seeds/fake_datasets.py's DEFAULT_SHARDS: the data for a seed depends on the shard count
+DEFAULT_SHARDS = 8
+# Last day of generated history, so the data for a seed doesn't change with the day the benchmark runs.
+# int_dates (and so the out_* models) only keeps the year up to today; move this forward now and
+# then, and rerun the baseline when you do.
+DEFAULT_END_DATE = date(2026, 9, 30)
+
+
+def prepare_data(target: str, scale: int, args, workdir: Path) -> dict:
+    """Generate and load the raw tables for one scale factor. Returns env overrides for dbt."""
+    common = [
+        "--scale", str(scale), "--seed", str(args.seed), "--shards", str(args.shards),
+        "--end-date", args.end_date.isoformat(),
+    ]
+    if target_type(target, args.profiles_dir) == "duckdb":
+        data_dir = workdir / f"scale-{scale}"
+        subprocess.run(
+            [sys.executable, SEEDS_DIR / "fake_datasets.py", *common, "--format", args.format, "--output-dir", data_dir],
+            check=True,
+        )
+        location = "{name}.csv" if args.format == "csv" else "{name}/*.parquet"
+        return {
+            "DBT_DUCKDB_PATH": str(data_dir / "benchmark.duckdb"),
+            "DBT_DUCKDB_RAW_LOCATION": str(data_dir / location),
+        }
+    loader = [sys.executable, SEEDS_DIR / "load_raw.py", *common]
+    if args.sslmode:
+        loader += ["--sslmode", args.sslmode]
+    subprocess.run(loader, check=True, cwd=SEEDS_DIR)
+    return {}
+
+
+def target_type(target: str, profiles_dir: str | None) -> str:
+    """Best-effort lookup of the adapter type for `target` in profiles.yml."""
+    profiles = Path(profiles_dir or PROJECT_DIR) / "profiles.yml"
+    in_target = False
+    for line in profiles.read_text().splitlines():
+        stripped = line.strip()
+        if stripped == f"{target}:":
+            in_target = True
+        elif in_target and stripped.startswith("type:"):
+            return stripped.split(":", 1)[1].strip()
+    return "postgres"
+
+
+def run_dbt_build(target: str, args, env: dict) -> list[dict]:
+    """Run a full-refresh `dbt build` and return the per-node results."""
+    cmd = ["dbt", "build", "--full-refresh", "--target", target, "--project-dir", str(PROJECT_DIR)]
+    cmd += ["--profiles-dir", args.profiles_dir or str(PROJECT_DIR)]
+    if args.select:
+        cmd += ["--select", *args.select]
+    run_results_path = PROJECT_DIR / "target" / "run_results.json"
+    # Never read the previous scale's results as this run's
+    run_results_path.unlink(missing_ok=True)
+    proc = subprocess.run(cmd, env={**os.environ, **env}, cwd=PROJECT_DIR)
+    if proc.returncode != 0:
+        if not run_results_path.exists():
+            sys.exit(f"❌ dbt build exited with {proc.returncode} before running any node")
+        print(f"⚠️  dbt build exited with {proc.returncode}; recording the nodes that ran")
+    run_results = json.loads(run_results_path.read_text())
+    return [
+        {
+            "unique_id": r["unique_id"],
+            "status": r["status"],
+            "execution_time": round(r["execution_time"], 4),
+            "rows_affected": (r.get("adapter_response") or {}).get("rows_affected"),
+        }
+        for r in run_results["results"]
+    ]
+
+
+def growth_exponent(points: list[tuple[int, float]]) -> float | None:
+    """Least-squares slope of log(time) against log(scale); ~1 is linear."""
+    points = [(s, t) for s, t in points if t > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(s) for s, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+def summarize(scales: list[int], runs: dict[int, list[dict]], threshold: float) -> dict:
+    nodes: dict[str, dict] = {}
+    for scale in scales:
+        for r in runs[scale]:
+            node = nodes.setdefault(r["unique_id"], {"runs": {}})
+            node["runs"][str(scale)] = {k: r[k] for k in ("status", "execution_time", "rows_affected")}
+    for node in nodes.values():
+        points = [(int(s), r["execution_time"]) for s, r in node["runs"].items()]
+        exponent = growth_exponent(points)
+        largest = max(points)[1]
+        node["growth_exponent"] = None if exponent is None else round(exponent, 3)
+        node["superlinear"] = exponent is not None and exponent > threshold and largest >= MIN_FLAG_SECONDS
+    return nodes
+
+
+def print_table(result: dict, baseline: dict | None = None) -> None:
+    scales = [str(s) for s in result["scales"]]
+    largest = scales[-1]
+    header = f"{'node':<60}" + "".join(f"{'x' + s:>10}" for s in scales) + f"{'exp':>7}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    print("\n" + header)
+    print("-" * len(header))
+    ordered = sorted(
+        result["nodes"].items(),
+        key=lambda item: -item[1]["runs"].get(largest, {}).get("execution_time", 0),
+    )
+    for unique_id, node in ordered:
+        row = f"{unique_id[-59:]:<60}"
+        for s in scales:
+            t = node["runs"].get(s, {}).get("execution_time")
+            row += f"{t:>10.2f}" if t is not None else f"{'-':>10}"
+        exponent = node["growth_exponent"]
+        row += f"{exponent:>7.2f}" if exponent is not None else f"{'-':>7}"
+        if baseline:
+            base = baseline["nodes"].get(unique_id, {}).get("runs", {}).get(largest, {}).get("execution_time")
+            now = node["runs"].get(largest, {}).get("execution_time")
+            row += f"{now / base:>8.2f}x" if base and now is not None else f"{'-':>9}"
+        failed = sorted({r["status"] for r in node["runs"].values()} - {"success", "pass"})
+        if failed:
+            row += f"  ❌ {'/'.join(failed)}"
+        if node["superlinear"]:
+            row += "  ⚠️ superlinear"
+        print(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dbt node build times across data scale factors.")
+    parser.add_argument("--target", default="local", help="dbt target to benchmark (default: local)")
+    parser.add_argument("--profiles-dir", default=None, help="dbt profiles directory (default: this project)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16], help="Scale factors (default: 1 4 16)")
+    parser.add_argument("--seed", type=int, default=42, help="Master seed so every branch sees the same data")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help=f"Generator shards (default: {DEFAULT_SHARDS})")
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=DEFAULT_END_DATE,
+        help=f"Last day of generated history, YYYY-MM-DD (default: {DEFAULT_END_DATE})",
+    )
+    parser.add_argument("--format", choices=("csv", "parquet"), default="parquet", help="File format for DuckDB targets")
+    parser.add_argument("--sslmode", default=None, help="sslmode passed to load_raw.py for Postgres targets")
+    parser.add_argument("--select", nargs="*", default=None, help="dbt node selection")
+    parser.add_argument(
+        "--threshold", type=float, default=1.2,
+        help="Flag nodes whose log-log time/scale slope exceeds this (default: 1.2)",
+    )
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    scales = sorted(set(args.scales))
+    runs = {}
+    workdir = Path(tempfile.mkdtemp(prefix="dbt-benchmark-"))
+    try:
+        for scale in scales:
+            print(f"\n🔧 Scale x{scale}: preparing data...")
+            started = time.perf_counter()
+            env = prepare_data(args.target, scale, args, workdir)
+            load_seconds = time.perf_counter() - started
+            print(f"🔧 Scale x{scale}: data ready in {load_seconds:.1f}s, running dbt build...")
+            runs[scale] = run_dbt_build(args.target, args, env)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        "target": args.target,
+        "seed": args.seed,
+        "shards": args.shards,
+        "end_date": args.end_date.isoformat(),
+        "scales": scales,
+        "threshold": args.threshold,
+        "nodes": summarize(scales, runs, args.threshold),
+    }
+    Path(args.output).write_text(json.dumps(result, indent=2, sort_keys=True) + "\n")
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    if baseline:
+        differs = [k for k in ("seed", "shards", "end_date") if baseline.get(k) != result[k]]
+        if differs:
+            print(f"⚠️  Baseline was generated with a different {', '.join(differs)}; timings aren't comparable")
+    print_table(result, baseline)
+    flagged = [uid for uid, node in result["nodes"].items() if node["superlinear"]]
+    print(f"\n✓ Results written to {args.output}")
+    if flagged:
+        print(f"⚠️  {len(flagged)} node(s) grow superlinearly: {', '.join(flagged)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+{#
+  Column-level checks for wide models in a single scan.
+
+  Separate not_null / unique / accepted_values tests each read the whole
+  model; column_checks computes all of them in one aggregate query and
+  returns one row per failing (check, column) with its failure count:
+
+    models:
+      - name: int_transactions
+        data_tests:
+          - column_checks:
+              arguments:
+                not_null: [id, customer_name, amount]
+                unique: [id]
+                accepted_values:
+                  payment_status: ['Pending', 'Completed', 'Failed']
+                # optional, for large tables:
+                recent: {column: transaction_date, days: 3}
+                sample_percent: 10
+
+  The test's failure count is the total number of failing rows; set
+  store_failures: true to keep the per-column breakdown in the audit
+  schema. `recent` only checks rows whose column is within the last `days`
+  days (default: the incremental_lookback_days var); `sample_percent` reads
+  a random sample of the table (tables only on Postgres). As with
+  accepted_values, nulls are not counted as unaccepted values.
+
+  It is an ordinary generic test, so it sits alongside column data_tests.
+#}
+
+{% test column_checks(model, not_null=[], unique=[], accepted_values={}, recent=none, sample_percent=none) %}
+  {{ config(fail_calc='coalesce(sum(failures), 0)') }}
+
+  {%- set checks = [] -%}
+  {%- for column in not_null -%}
+    {%- do checks.append(('not_null', column, 'sum(case when ' ~ column ~ ' is null then 1 else 0 end)')) -%}
+  {%- endfor -%}
+  {%- for column in unique -%}
+    {%- do checks.append(('unique', column, 'count(' ~ column ~ ') - count(distinct ' ~ column ~ ')')) -%}
+  {%- endfor -%}
+  {%- for column, values in accepted_values.items() -%}
+    {%- set quoted = [] -%}
+    {%- for value in values -%}
+      {%- do quoted.append(value if value is number else "'" ~ (value | replace("'", "''")) ~ "'") -%}
+    {%- endfor -%}
+    {%- do checks.append((
+      'accepted_values', column,
+      'sum(case when ' ~ column ~ ' not in (' ~ quoted | join(', ') ~ ') then 1 else 0 end)'
+    )) -%}
+  {%- endfor -%}
+
+  {%- if not checks -%}
+    {{ exceptions.raise_compiler_error("column_checks on " ~ model ~ " needs at least one of not_null, unique or accepted_values") }}
+  {%- endif -%}
+
+with scoped as (
+
+  select * from {{ column_checks_sample(model, sample_percent) }}
+  {%- if recent %}
+  where {{ recent['column'] }} >= {{ dbt.dateadd('day', -(recent.get('days') or var('incremental_lookback_days', 3)), 'current_date') }}
+  {%- endif %}
+
+),
+
+totals as (
+
+  select
+    {%- for check_name, column, expression in checks %}
+    {{ expression }} as check_{{ loop.index }}{{ "," if not loop.last }}
+    {%- endfor %}
+  from scoped
+
+),
+
+{#- Unpivot with a CASE over a VALUES list so `totals` (and the model) is read once #}
+per_column as (
+
+  select
+    c.check_name,
+    c.column_name,
+    case c.check_id
+      {%- for check_name, column, expression in checks %}
+      when {{ loop.index }} then totals.check_{{ loop.index }}
+      {%- endfor %}
+    end as failures
+  from totals
+  cross join (
+    values
+      {%- for check_name, column, expression in checks %}
+      ({{ loop.index }}, '{{ check_name }}', '{{ column }}'){{ "," if not loop.last }}
+      {%- endfor %}
+  ) as c (check_id, check_name, column_name)
+
+)
+
+select check_name, column_name, failures
+from per_column
+where failures > 0
+
+{% endtest %}
+
+
+{# The model relation, optionally as a random sample of `percent` percent of its rows. #}
+{% macro column_checks_sample(relation, percent) %}
+  {{ return(adapter.dispatch('column_checks_sample')(relation, percent)) }}
+{% endmacro %}
+
+{% macro default__column_checks_sample(relation, percent) -%}
+  {{ relation }}{% if percent %} tablesample system ({{ percent }}){% endif %}
+{%- endmacro %}
+
+{% macro duckdb__column_checks_sample(relation, percent) -%}
+  {{ relation }}{% if percent %} tablesample {{ percent }} percent (system){% endif %}
+{%- endmacro %}
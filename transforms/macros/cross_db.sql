@@ -0,0 +1,16 @@
+{#
+  Cross-database helpers for SQL that differs between the Postgres and
+  DuckDB targets. Date truncation, date arithmetic, date spines and string
+  concatenation use dbt's built-in dbt.date_trunc / dbt.dateadd /
+  dbt.date_spine / dbt.concat macros; this file covers the gaps.
+#}
+
+
+{# Extract a numeric date part such as 'dow', 'day' or 'doy'. #}
+{% macro date_part(datepart, date) %}
+  {{ return(adapter.dispatch('date_part')(datepart, date)) }}
+{% endmacro %}
+
+{% macro default__date_part(datepart, date) -%}
+  date_part('{{ datepart }}', {{ date }})
+{%- endmacro %}
@@ -0,0 +1,20 @@
+{#
+  Lower bound for the rows an incremental model reprocesses: the latest
+  value of `column` already in {{ this }}, minus the configurable
+  `incremental_lookback_days` window so late-arriving rows are picked up.
+  Falls back to reprocessing everything when {{ this }} is empty.
+#}
+{% macro incremental_watermark(column) %}
+  coalesce(
+    {{ dbt.dateadd('day', -var("incremental_lookback_days"), "(SELECT max(" ~ column ~ ") FROM " ~ this ~ ")") }},
+    cast('1900-01-01' as {{ dbt.type_timestamp() }})
+  )
+{% endmacro %}
+
+{#
+  Remove rows that have aged out of int_dates. A full rebuild drops them via
+  the inner join; incremental runs need to delete them explicitly.
+#}
+{% macro delete_expired_dates(column) %}
+  DELETE FROM {{ this }} WHERE {{ column }} < (SELECT min(date_day) FROM {{ ref('int_dates') }})
+{% endmacro %}
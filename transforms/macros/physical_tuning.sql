@@ -0,0 +1,137 @@
+{#
+  Physical tuning helpers that models opt into through config.
+
+  Indexes use dbt-postgres' native `indexes` config, wrapped in
+  tuning_indexes() so other targets skip them, e.g.
+    indexes=tuning_indexes([{'columns': ['id']}, {'columns': ['transaction_date'], 'type': 'brin'}])
+
+  The macros below are meant for hooks:
+    pre_hook="{{ ensure_month_partitions('transaction_date') }}",
+    post_hook=["{{ partition_by_month('transaction_date') }}", "{{ analyze_table() }}"]
+
+  They dispatch on the adapter and render to nothing on targets without support.
+#}
+
+
+{# Index definitions for the `indexes` config; only Postgres builds them. #}
+{% macro tuning_indexes(indexes) %}
+  {{ return(adapter.dispatch('tuning_indexes')(indexes)) }}
+{% endmacro %}
+
+{% macro default__tuning_indexes(indexes) %}
+  {{ return([]) }}
+{% endmacro %}
+
+{% macro postgres__tuning_indexes(indexes) %}
+  {{ return(indexes) }}
+{% endmacro %}
+
+
+{# Refresh planner statistics after a table or incremental model is built. #}
+{% macro analyze_table() %}
+  {{ return(adapter.dispatch('analyze_table')()) }}
+{% endmacro %}
+
+{% macro default__analyze_table() %}{% endmacro %}
+
+{% macro postgres__analyze_table() %}
+  {% if config.get('materialized') != 'view' %}
+    ANALYZE {{ this }}
+  {% endif %}
+{% endmacro %}
+
+
+{#
+  Post-hook: turn a freshly built table into one range-partitioned by month on
+  `column`. dbt creates tables with CREATE TABLE AS, which can't be
+  partitioned, so on the first build (or a full refresh) the plain table is
+  swapped for a partitioned copy with the same columns and indexes. Partitions
+  cover every month in the data up to next month. Already-partitioned tables
+  are left alone.
+#}
+{% macro partition_by_month(column) %}
+  {{ return(adapter.dispatch('partition_by_month')(column)) }}
+{% endmacro %}
+
+{% macro default__partition_by_month(column) %}{% endmacro %}
+
+{% macro postgres__partition_by_month(column) %}
+  {%- set relation = this.include(database=False) -%}
+  {%- set unpartitioned = this.incorporate(path={'identifier': this.identifier ~ '__unpartitioned'}).include(database=False) -%}
+  DO $$
+  DECLARE
+    m timestamp;
+    part text;
+  BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('{{ relation }}')) = 'r' THEN
+      ALTER TABLE {{ relation }} RENAME TO {{ unpartitioned.identifier }};
+      CREATE TABLE {{ relation }} (LIKE {{ unpartitioned }} INCLUDING ALL) PARTITION BY RANGE ({{ column }});
+      {{ _month_partition_loop(
+          relation,
+          "(SELECT min(" ~ column ~ ") FROM " ~ unpartitioned ~ ")",
+          "(SELECT max(" ~ column ~ ") FROM " ~ unpartitioned ~ ")"
+      ) }}
+      INSERT INTO {{ relation }} SELECT * FROM {{ unpartitioned }};
+      DROP TABLE {{ unpartitioned }};
+      ANALYZE {{ relation }};
+    END IF;
+  END $$
+{% endmacro %}
+
+
+{#
+  Pre-hook for incremental models built with partition_by_month: create the
+  partitions the incoming rows will land in, from the month of the latest
+  loaded `column` value up to next month.
+#}
+{% macro ensure_month_partitions(column) %}
+  {{ return(adapter.dispatch('ensure_month_partitions')(column)) }}
+{% endmacro %}
+
+{% macro default__ensure_month_partitions(column) %}{% endmacro %}
+
+{% macro postgres__ensure_month_partitions(column) %}
+  {%- set relation = this.include(database=False) -%}
+  DO $$
+  DECLARE
+    m timestamp;
+    part text;
+  BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('{{ relation }}')) = 'p' THEN
+      {{ _month_partition_loop(relation, "(SELECT max(" ~ column ~ ") FROM " ~ relation ~ ")", "NULL") }}
+    END IF;
+  END $$
+{% endmacro %}
+
+
+{#
+  PL/pgSQL loop creating one `<table>_pYYYYMM` partition per month from
+  `from_expr` to the later of `to_expr` and next month. Expects `timestamp`
+  and `text` variables `m` and `part` to be declared.
+
+  On a full refresh the previous table is only dropped after the post-hooks
+  run, so its partitions still hold the names we need; those are dropped
+  here, inside the same transaction.
+#}
+{% macro _month_partition_loop(relation, from_expr, to_expr) %}
+  FOR m IN
+    SELECT generate_series(
+      date_trunc('month', coalesce({{ from_expr }}, now())),
+      date_trunc('month', greatest({{ to_expr }}, now() + interval '1 month')),
+      interval '1 month'
+    )
+  LOOP
+    part := format('%I.%I', '{{ relation.schema }}', '{{ relation.identifier }}_p' || to_char(m, 'YYYYMM'));
+    IF to_regclass(part) IS NOT NULL AND NOT EXISTS (
+      SELECT 1 FROM pg_inherits
+      WHERE inhrelid = to_regclass(part) AND inhparent = to_regclass('{{ relation }}')
+    ) THEN
+      EXECUTE 'DROP TABLE ' || part;
+    END IF;
+    EXECUTE format(
+      'CREATE TABLE IF NOT EXISTS %s PARTITION OF %I.%I FOR VALUES FROM (%L) TO (%L)',
+      part, '{{ relation.schema }}', '{{ relation.identifier }}',
+      m, m + interval '1 month'
+    );
+  END LOOP;
+{% endmacro %}
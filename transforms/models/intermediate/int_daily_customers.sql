@@ -0,0 +1,29 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key='date',
+    incremental_strategy='delete+insert',
+    indexes=tuning_indexes([
+      {'columns': ['date']}
+    ])
+  )
+}}
+
+-- Distinct customers per day and per day x store. Distinct counts don't add up
+-- across groups, so they are computed here at each grain the out_* models need
+-- instead of being carried through int_daily_sales. Rows with a null store_id
+-- count the customers of all stores. This is a second, deliberate scan of
+-- int_transactions; intermediate.yml says why.
+SELECT
+  {{ dbt.date_trunc('day', 'transaction_date') }} as date,
+  store_id,
+  store_name,
+  COUNT(DISTINCT customer_id) as total_customers
+FROM {{ ref('int_transactions') }}
+{% if is_incremental() %}
+WHERE transaction_date >= {{ incremental_watermark('date') }}
+{% endif %}
+GROUP BY GROUPING SETS (
+  ({{ dbt.date_trunc('day', 'transaction_date') }}),
+  ({{ dbt.date_trunc('day', 'transaction_date') }}, store_id, store_name)
+)
@@ -0,0 +1,29 @@
+{{
+  config(
+    materialized='incremental',
+    unique_key='date',
+    incremental_strategy='delete+insert',
+    indexes=tuning_indexes([
+      {'columns': ['date']}
+    ])
+  )
+}}
+
+SELECT
+  {{ dbt.date_trunc('day', 'transaction_date') }} as date,
+  store_id,
+  store_name,
+  product_id,
+  product_name,
+  SUM(amount) as total_amount,
+  COUNT(*) as total_transactions
+FROM {{ ref('int_transactions') }}
+{% if is_incremental() %}
+WHERE transaction_date >= {{ incremental_watermark('date') }}
+{% endif %}
+GROUP BY
+  {{ dbt.date_trunc('day', 'transaction_date') }},
+  store_id,
+  store_name,
+  product_id,
+  product_name
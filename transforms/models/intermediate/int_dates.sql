@@ -1,22 +1,25 @@
 {{
   config(
-    materialized='table'
+    materialized='table',
+    indexes=tuning_indexes([
+      {'columns': ['date_day'], 'unique': True}
+    ])
   )
 }}
 
 WITH 
   dates as (
-    SELECT generate_series(
-    date_trunc('day', current_date) - interval '1 years',
-    date_trunc('day', current_date),
-    interval '1 day'
-  ) as date_day
+    {{ dbt.date_spine(
+        'day',
+        dbt.dateadd('year', -1, 'current_date'),
+        dbt.dateadd('day', 1, 'current_date')
+    ) }}
 )
 SELECT
   date_day,
-  date_trunc('month', date_day) as date_month,
-  date_trunc('year', date_day) as date_year,
-  date_part('dow', date_day) as date_day_of_week,
-  date_part('day', date_day) as date_day_of_month,
-  date_part('doy', date_day) as date_day_of_year
-FROM dates
+  {{ dbt.date_trunc('month', 'date_day') }} as date_month,
+  {{ dbt.date_trunc('year', 'date_day') }} as date_year,
+  {{ date_part('dow', 'date_day') }} as date_day_of_week,
+  {{ date_part('day', 'date_day') }} as date_day_of_month,
+  {{ date_part('doy', 'date_day') }} as date_day_of_year
+FROM dates
\ No newline at end of file
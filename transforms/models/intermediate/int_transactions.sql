@@ -1,6 +1,14 @@
 {{
   config(
-    materialized='view'
+    materialized='incremental',
+    unique_key='id',
+    incremental_strategy='delete+insert',
+    indexes=tuning_indexes([
+      {'columns': ['id']},
+      {'columns': ['transaction_date'], 'type': 'brin'}
+    ]),
+    pre_hook="{{ ensure_month_partitions('transaction_date') }}",
+    post_hook="{{ partition_by_month('transaction_date') }}"
   )
 }}
 
@@ -8,7 +16,7 @@ SELECT
 
   t.id,
   t.customer_id,
-  c.first_name || ' ' || c.last_name AS customer_name,
+  {{ dbt.concat(["c.first_name", "' '", "c.last_name"]) }} AS customer_name,
   t.product_id,
   p.name AS product_name,
   t.store_id,
@@ -26,4 +34,7 @@ INNER JOIN {{ ref('stg_customers') }} c
 INNER JOIN {{ ref('stg_products') }} p
   ON t.product_id = p.id
 INNER JOIN {{ ref('stg_stores') }} s
-  ON t.store_id = s.id
\ No newline at end of file
+  ON t.store_id = s.id
+{% if is_incremental() %}
+WHERE t.transaction_date >= {{ incremental_watermark('transaction_date') }}
+{% endif %}
@@ -1,17 +1,41 @@
 {{
   config(
-    materialized='table'
+    materialized='incremental',
+    unique_key='date',
+    incremental_strategy='delete+insert',
+    indexes=tuning_indexes([
+      {'columns': ['date'], 'unique': True}
+    ]),
+    post_hook="{{ delete_expired_dates('date') }}"
   )
 }}
 
+WITH
+  daily_sales as (
+    SELECT s.*
+    FROM {{ ref('int_daily_sales') }} s
+    INNER JOIN {{ ref('int_dates') }} d
+      ON s.date = d.date_day
+    {% if is_incremental() %}
+    WHERE s.date >= {{ incremental_watermark('date') }}
+    {% endif %}
+  ),
+  daily_customers as (
+    SELECT date, total_customers
+    FROM {{ ref('int_daily_customers') }}
+    WHERE store_id IS NULL
+    {% if is_incremental() %}
+    AND date >= {{ incremental_watermark('date') }}
+    {% endif %}
+  )
 SELECT
-  d.date_day as date,
-  SUM(amount) as total_amount,
-  COUNT(DISTINCT customer_id) as total_customers,
-  COUNT(DISTINCT product_id) as total_products,
-  COUNT(DISTINCT store_id) as total_stores
-FROM {{ ref('int_transactions') }} t
-INNER JOIN {{ ref('int_dates') }} d
-  ON t.transaction_date = d.date_day
-GROUP BY d.date_day
-ORDER BY d.date_day DESC  
\ No newline at end of file
+  s.date,
+  SUM(s.total_amount) as total_amount,
+  c.total_customers,
+  COUNT(DISTINCT s.product_id) as total_products,
+  COUNT(DISTINCT s.store_id) as total_stores
+FROM daily_sales s
+INNER JOIN daily_customers c
+  ON s.date = c.date
+GROUP BY s.date, c.total_customers
+ORDER BY s.date DESC  
@@ -1,17 +1,42 @@
 {{
   config(
-    materialized='table'
+    materialized='incremental',
+    unique_key=['date', 'store_name'],
+    incremental_strategy='delete+insert',
+    indexes=tuning_indexes([
+      {'columns': ['date', 'store_name']}
+    ]),
+    post_hook="{{ delete_expired_dates('date') }}"
   )
 }}
 
+WITH
+  daily_sales as (
+    SELECT s.*
+    FROM {{ ref('int_daily_sales') }} s
+    INNER JOIN {{ ref('int_dates') }} d
+      ON s.date = d.date_day
+    {% if is_incremental() %}
+    WHERE s.date >= {{ incremental_watermark('date') }}
+    {% endif %}
+  ),
+  daily_customers as (
+    SELECT date, store_name, total_customers
+    FROM {{ ref('int_daily_customers') }}
+    WHERE store_id IS NOT NULL
+    {% if is_incremental() %}
+    AND date >= {{ incremental_watermark('date') }}
+    {% endif %}
+  )
 SELECT
-  d.date_day as date,
-  store_name,
-  SUM(amount) as total_amount,
-  COUNT(DISTINCT customer_id) as total_customers,
-  COUNT(DISTINCT product_id) as total_products
-FROM {{ ref('int_transactions') }} t
-INNER JOIN {{ ref('int_dates') }} d
-  ON t.transaction_date = d.date_day
-GROUP BY t.store_name, d.date_day
-ORDER BY t.store_name, d.date_day DESC
\ No newline at end of file
+  s.date,
+  s.store_name,
+  SUM(s.total_amount) as total_amount,
+  c.total_customers,
+  COUNT(DISTINCT s.product_id) as total_products
+FROM daily_sales s
+INNER JOIN daily_customers c
+  ON s.date = c.date
+  AND s.store_name = c.store_name
+GROUP BY s.store_name, s.date, c.total_customers
+ORDER BY s.store_name, s.date DESC
@@ -6,7 +6,7 @@
 
 SELECT
   product_name,
-  SUM(amount) as total_amount
-FROM {{ ref('int_transactions') }}
+  SUM(total_amount) as total_amount
+FROM {{ ref('int_daily_sales') }}
 GROUP BY product_name
 ORDER BY total_amount DESC
\ No newline at end of file
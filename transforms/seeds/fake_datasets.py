@@ -1,93 +1,400 @@
-from faker import Faker
-import random
-import uuid
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
+from faker import Faker
 
 fake = Faker()
 
-def generate_data():
+# Size of the Faker pools that names, companies and addresses are drawn from.
+# Faker is slow per call, so we only use it to build small pools and then
+# sample from them with NumPy.
+POOL_SIZE = 500
+
+SALUTATIONS = np.array(['Mr.', 'Mrs.', 'Ms.', 'Dr.', 'Prof.'])
+CATEGORIES = np.array(['Electronics', 'Clothing', 'Books', 'Toys', 'Furniture', 'Other'])
+PAYMENT_METHODS = np.array(['Credit Card', 'Debit Card', 'Cash', 'Other'])
+PAYMENT_STATUSES = np.array(['Pending', 'Completed', 'Failed'])
+TRANSACTION_COLUMNS = [
+    "id", "customer_id", "product_id", "store_id", "transaction_date", "amount",
+    "currency", "payment_method", "payment_status", "payment_reference",
+]
+
+TIMESTAMP_COLUMNS = ("created_at", "updated_at", "transaction_date")
+
+FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Fixed, so a --seed gives the same data on any machine; the worker pool follows the CPU count instead
+DEFAULT_SHARDS = 8
+
+_HEX = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+_DASH = np.full(1, ord('-'), dtype=np.uint8)
+
+
+def _uuid4s(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Generate `n` random UUID4 strings without a Python-level loop."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    hexed = np.empty((n, 32), dtype=np.uint8)
+    hexed[:, 0::2] = _HEX[raw >> 4]
+    hexed[:, 1::2] = _HEX[raw & 0x0F]
+    dash = np.broadcast_to(_DASH, (n, 1))
+    chars = np.concatenate(
+        [hexed[:, :8], dash, hexed[:, 8:12], dash, hexed[:, 12:16], dash,
+         hexed[:, 16:20], dash, hexed[:, 20:]],
+        axis=1,
+    )
+    return np.ascontiguousarray(chars).view('S36').ravel().astype('U36')
+
+
+def _timestamps(rng: np.random.Generator, n: int, start: datetime, end: datetime) -> np.ndarray:
+    """Sample `n` ISO-8601 timestamps uniformly between `start` and `end`."""
+    start_us = np.datetime64(start, 'us')
+    span_us = int((end - start) / timedelta(microseconds=1))
+    offsets = rng.integers(0, span_us, size=n).astype('timedelta64[us]')
+    return np.datetime_as_string(start_us + offsets, unit='us')
+
+
+def _pool(factory, size: int = POOL_SIZE) -> np.ndarray:
+    """Call a Faker provider `size` times to build a reusable pool of values."""
+    return np.array([factory() for _ in range(size)])
+
+
+def _sample(rng: np.random.Generator, values, n: int) -> np.ndarray:
+    return np.asarray(values)[rng.integers(0, len(values), size=n)]
+
+
+def generate_customers(rng: np.random.Generator, num_customers: int, start: datetime, end: datetime) -> pd.DataFrame:
+    first_names = _sample(rng, _pool(fake.first_name), num_customers)
+    last_names = _sample(rng, _pool(fake.last_name), num_customers)
+    email_suffixes = rng.integers(1, 10_000, size=num_customers).astype(str)
+    return pd.DataFrame({
+        "id": _uuid4s(rng, num_customers),
+        "salutation": _sample(rng, SALUTATIONS, num_customers),
+        "first_name": first_names,
+        "last_name": last_names,
+        "email": (
+            pd.Series(first_names).str.lower() + pd.Series(last_names).str.lower()
+            + email_suffixes + '@' + _sample(rng, _pool(fake.free_email_domain, 20), num_customers)
+        ),
+        "phone": _sample(rng, _pool(fake.phone_number), num_customers),
+        "created_at": _timestamps(rng, num_customers, start, end),
+        "updated_at": _timestamps(rng, num_customers, start, end),
+    })
+
+
+def generate_products(rng: np.random.Generator, num_products: int, start: datetime, end: datetime) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": _uuid4s(rng, num_products),
+        "name": _sample(rng, _pool(fake.word), num_products),
+        "brand": _sample(rng, _pool(fake.company), num_products),
+        "category": _sample(rng, CATEGORIES, num_products),
+        "description": _sample(rng, _pool(fake.text, 100), num_products),
+        "price": rng.integers(10, 1001, size=num_products),
+        "created_at": _timestamps(rng, num_products, start, end),
+        "updated_at": _timestamps(rng, num_products, start, end),
+    })
+
+
+def generate_stores(rng: np.random.Generator, num_stores: int, start: datetime, end: datetime) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": _uuid4s(rng, num_stores),
+        "name": [fake.company() for _ in range(num_stores)],
+        "address": [fake.address() for _ in range(num_stores)],
+        "city": [fake.city() for _ in range(num_stores)],
+        "postcode": [fake.postcode() for _ in range(num_stores)],
+        "country": [fake.country() for _ in range(num_stores)],
+        "created_at": _timestamps(rng, num_stores, start, end),
+        "updated_at": _timestamps(rng, num_stores, start, end),
+    })
+
+
+def generate_transactions(
+    rng: np.random.Generator,
+    num_transactions: int,
+    customer_ids: np.ndarray,
+    product_ids: np.ndarray,
+    store_ids: np.ndarray,
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": _uuid4s(rng, num_transactions),
+        "customer_id": _sample(rng, customer_ids, num_transactions),
+        "product_id": _sample(rng, product_ids, num_transactions),
+        "store_id": _sample(rng, store_ids, num_transactions),
+        "transaction_date": _timestamps(rng, num_transactions, start, end),
+        "amount": np.round(rng.random(num_transactions) * 500, 2),
+        "currency": "GBP",
+        "payment_method": rng.choice(PAYMENT_METHODS, size=num_transactions),
+        "payment_status": rng.choice(PAYMENT_STATUSES, size=num_transactions),
+        "payment_reference": _uuid4s(rng, num_transactions),
+    })
+
+
+def iter_transaction_chunks(
+    rng: np.random.Generator,
+    num_transactions: int,
+    chunk_size: int,
+    customer_ids: np.ndarray,
+    product_ids: np.ndarray,
+    store_ids: np.ndarray,
+    start: datetime,
+    end: datetime,
+) -> Iterator[pd.DataFrame]:
+    """Yield transactions in DataFrames of at most `chunk_size` rows."""
+    for offset in range(0, num_transactions, chunk_size):
+        size = min(chunk_size, num_transactions - offset)
+        yield generate_transactions(rng, size, customer_ids, product_ids, store_ids, start, end)
+
+
+class TableWriter:
+    """
+    Append DataFrame chunks to a single CSV file or to a directory of Parquet parts.
+
+    When `shard` is set, CSV output goes to a per-shard file (with a header only
+    on shard 0) that `_merge_csv_shards` concatenates afterwards, and Parquet
+    parts are prefixed with the shard number.
+    """
+
+    def __init__(self, name: str, fmt: str = "csv", output_dir: Path | str = ".", shard: int | None = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}', expected one of {FORMATS}")
+        self.fmt = fmt
+        self.rows = 0
+        self.parts = 0
+        output_dir = Path(output_dir)
+        if fmt == "csv":
+            self.path = output_dir / f"{name}.csv" if shard is None else _csv_shard_path(output_dir, name, shard)
+            self.header = shard in (None, 0)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            self.path = output_dir / name
+            self.prefix = "part" if shard is None else f"part-{shard:05d}"
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            first = self.parts == 0
+            df.to_csv(self.path, mode="w" if first else "a", header=first and self.header, index=False)
+        else:
+            # Store timestamps as real Parquet timestamps so readers don't have to cast
+            df = df.astype({c: "datetime64[us]" for c in TIMESTAMP_COLUMNS if c in df.columns})
+            df.to_parquet(self.path / f"{self.prefix}-{self.parts:05d}.parquet", index=False)
+        self.rows += len(df)
+        self.parts += 1
+
+
+def _csv_shard_path(output_dir: Path, name: str, shard: int) -> Path:
+    return output_dir / f"{name}.csv.shard-{shard:05d}"
+
+
+def _merge_csv_shards(output_dir: Path, name: str, num_shards: int) -> None:
+    """Concatenate per-shard CSV files, in shard order, into `<name>.csv`."""
+    with open(output_dir / f"{name}.csv", "wb") as out:
+        for shard in range(num_shards):
+            path = _csv_shard_path(output_dir, name, shard)
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, out, length=16 * 1024 * 1024)
+            path.unlink()
+
+
+def _clear_parquet_parts(output_dir: Path, name: str) -> None:
+    for stale in (output_dir / name).glob("part-*.parquet"):
+        stale.unlink()
+
+
+def _shard_sizes(total: int, num_shards: int) -> list[int]:
+    base, extra = divmod(total, num_shards)
+    return [base + (1 if i < extra else 0) for i in range(num_shards)]
+
+
+@dataclass
+class TransactionShard:
+    """One independently seeded slice of the transactions table."""
+
+    shard: int
+    seed_seq: np.random.SeedSequence
+    num_transactions: int
+    customer_ids: np.ndarray
+    product_ids: np.ndarray
+    store_ids: np.ndarray
+    start: datetime
+    end: datetime
+
+    def chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        return iter_transaction_chunks(
+            np.random.default_rng(self.seed_seq), self.num_transactions, chunk_size,
+            self.customer_ids, self.product_ids, self.store_ids, self.start, self.end,
+        )
+
+
+@dataclass
+class Dataset:
+    """Generated dimension tables plus the shard plan for the transactions table."""
+
+    seed: int
+    customers: pd.DataFrame
+    products: pd.DataFrame
+    stores: pd.DataFrame
+    shards: list[TransactionShard]
+
+    @property
+    def dimensions(self) -> dict[str, pd.DataFrame]:
+        return {"customers": self.customers, "products": self.products, "stores": self.stores}
+
+
+def build_dataset(
+    num_transactions: int | None = None,
+    scale: int = 1,
+    seed: int | None = None,
+    shards: int = DEFAULT_SHARDS,
+    end_date: date | None = None,
+) -> Dataset:
+    """
+    Generate the dimension tables and plan the transaction shards.
+
+    Every shard draws from its own seed spawned from the master `seed`, so for
+    a given seed, shard count and `end_date` (default: today) the output is
+    byte-identical. Customers, products and stores are generated once up front
+    and shared by all shards, keeping foreign keys consistent.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2**32)
+    dims_seq, *shard_seqs = np.random.SeedSequence(seed).spawn(shards + 1)
+    rng = np.random.default_rng(dims_seq)
+    fake.seed_instance(seed)
+
+    end = datetime.combine(end_date or date.today(), datetime.min.time())
+    start = end - timedelta(days=365)
 
     # CUSTOMERS
-    num_customers = random.randint(100, 1000)
-    customers = [
-        {
-            "id": str(uuid.uuid4()),
-            "salutation": fake.random_element(elements=('Mr.', 'Mrs.', 'Ms.', 'Dr.', 'Prof.')),
-            "first_name": fake.first_name(),
-            "last_name": fake.last_name(),
-            "email": fake.email(),
-            "phone": fake.phone_number(),
-            "created_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-            "updated_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-        }
-        for _ in range(num_customers)
-    ]
-    customers_df = pd.DataFrame(customers)
-    customers_df.to_csv('customers.csv', index=False)
+    num_customers = int(rng.integers(100, 1001)) * scale
+    customers_df = generate_customers(rng, num_customers, start, end)
 
     # PRODUCTS
-    num_products = random.randint(50, 100)
-    categories = ['Electronics', 'Clothing', 'Books', 'Toys', 'Furniture', 'Other']
-    products = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": fake.word(),
-            "brand": fake.company(),
-            "category": fake.random_element(elements=categories),
-            "description": fake.text(),
-            "price": fake.random_int(min=10, max=1000),
-            "created_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-            "updated_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-        }
-        for _ in range(num_products)
-    ]
-    products_df = pd.DataFrame(products)
-    products_df.to_csv('products.csv', index=False)
+    num_products = int(rng.integers(50, 101))
+    products_df = generate_products(rng, num_products, start, end)
 
     # STORES
     num_stores = 7
-    stores = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": fake.company(),
-            "address": fake.address(),
-            "city": fake.city(),
-            "postcode": fake.postcode(),
-            "country": fake.country(),
-            "created_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-            "updated_at": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-        }
-        for _ in range(num_stores)
-    ]
-    stores_df = pd.DataFrame(stores)
-    stores_df.to_csv('stores.csv', index=False)
+    stores_df = generate_stores(rng, num_stores, start, end)
 
     # TRANSACTIONS
-    num_transactions = random.randint(100000, 150000)
-    transactions = [
-        {
-            "id": str(uuid.uuid4()),
-            "customer_id": fake.random_element(elements=customers_df['id']),
-            "product_id": fake.random_element(elements=products_df['id']),
-            "store_id": fake.random_element(elements=stores_df['id']),
-            "transaction_date": fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
-            "amount": round(random.random() * 500, 2),
-            "currency": "GBP",
-            "payment_method": fake.random_element(elements=('Credit Card', 'Debit Card', 'Cash', 'Other')),
-            "payment_status": fake.random_element(elements=('Pending', 'Completed', 'Failed')),
-            "payment_reference": fake.uuid4(),
-        }
-        for _ in range(num_transactions)
+    if num_transactions is None:
+        num_transactions = int(rng.integers(100000, 150001)) * scale
+    customer_ids = customers_df["id"].to_numpy()
+    product_ids = products_df["id"].to_numpy()
+    store_ids = stores_df["id"].to_numpy()
+    transaction_shards = [
+        TransactionShard(shard, shard_seqs[shard], size, customer_ids, product_ids, store_ids, start, end)
+        for shard, size in enumerate(_shard_sizes(num_transactions, shards))
     ]
-    transactions_df = pd.DataFrame(transactions)
-    transactions_df.to_csv('transactions.csv', index=False)
+    return Dataset(seed, customers_df, products_df, stores_df, transaction_shards)
+
+
+def run_shards(fn, shards: list[TransactionShard], workers: int | None, *args) -> list:
+    """Call `fn(shard, *args)` for every shard, on a process pool when `workers` > 1."""
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers <= 1:
+        return [fn(shard, *args) for shard in shards]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, shard, *args) for shard in shards]
+        return [f.result() for f in futures]
+
+
+def _write_transaction_shard(shard: TransactionShard, chunk_size: int, fmt: str, output_dir: Path) -> int:
+    """Generate and write one shard of transactions. Runs in a worker process."""
+    writer = TableWriter("transactions", fmt, output_dir, shard=shard.shard)
+    for chunk in shard.chunks(chunk_size):
+        writer.write(chunk)
+    if writer.parts == 0 and fmt == "csv":
+        writer.write(pd.DataFrame(columns=TRANSACTION_COLUMNS))
+    return writer.rows
+
+
+def generate_data(
+    num_transactions: int | None = None,
+    scale: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    fmt: str = "csv",
+    output_dir: Path | str = ".",
+    seed: int | None = None,
+    shards: int = DEFAULT_SHARDS,
+    workers: int | None = None,
+    end_date: date | None = None,
+):
+    """
+    Generate the raw customers, products, stores and transactions tables.
+
+    `scale` multiplies the customer and transaction volumes. Transactions are
+    streamed to disk in chunks of `chunk_size` rows, so memory stays flat
+    regardless of the total row count, and are split into `shards` generated
+    on a pool of `workers` processes (see `build_dataset`).
+    """
+    output_dir = Path(output_dir)
+    dataset = build_dataset(num_transactions, scale, seed, shards, end_date)
+
+    shapes = {}
+    for name, df in dataset.dimensions.items():
+        if fmt == "parquet":
+            _clear_parquet_parts(output_dir, name)
+        TableWriter(name, fmt, output_dir).write(df)
+        shapes[name] = df.shape
+
+    if fmt == "parquet":
+        _clear_parquet_parts(output_dir, "transactions")
+    rows = run_shards(_write_transaction_shard, dataset.shards, workers, chunk_size, fmt, output_dir)
+    if fmt == "csv":
+        _merge_csv_shards(output_dir, "transactions", len(dataset.shards))
+    shapes["transactions"] = (sum(rows), len(TRANSACTION_COLUMNS))
+    shapes["seed"] = dataset.seed
 
-    return {
-        'customers': customers_df.shape,
-        'products': products_df.shape,
-        'stores': stores_df.shape,
-        'transactions': transactions_df.shape,
-    }
+    return shapes
 
 if __name__ == "__main__":
-    print(generate_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate fake raw datasets as CSV or Parquet files.")
+    parser.add_argument(
+        "--transactions", type=int, default=None,
+        help="Number of transactions to generate (default: random 100k-150k times --scale)",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1,
+        help="Multiply customer and transaction volumes by this factor (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows per transaction chunk written to disk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output file format (default: csv)")
+    parser.add_argument("--output-dir", default=".", help="Directory to write the tables to (default: .)")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for reproducible output (default: random)")
+    parser.add_argument(
+        "--shards", type=int, default=DEFAULT_SHARDS,
+        help=f"Number of transaction shards; output depends on seed and shard count (default: {DEFAULT_SHARDS})",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=None,
+        help="Last day of generated history, YYYY-MM-DD (default: today)",
+    )
+    args = parser.parse_args()
+    print(generate_data(
+        num_transactions=args.transactions,
+        scale=args.scale,
+        chunk_size=args.chunk_size,
+        fmt=args.format,
+        output_dir=args.output_dir,
+        seed=args.seed,
+        shards=args.shards,
+        workers=args.workers,
+        end_date=args.end_date,
+    ))
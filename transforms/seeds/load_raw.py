@@ -0,0 +1,235 @@
+"""
+Bulk loader for the raw source tables behind models/sources/raw.yml.
+
+Streams the output of fake_datasets.py straight into Postgres with
+COPY FROM STDIN instead of going through CSV files and `dbt seed`.
+Connection settings come from the same DBT_POSTGRES_* variables as
+profiles.yml. To try it against a local container:
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=postgres postgres:16
+    DBT_POSTGRES_HOST=localhost DBT_POSTGRES_USER=postgres \\
+    DBT_POSTGRES_PASSWORD=postgres DBT_POSTGRES_DB=postgres \\
+        python load_raw.py --scale 10 --seed 42 --sslmode disable
+"""
+
+import argparse
+import io
+import os
+import time
+from datetime import date
+
+import pandas as pd
+import psycopg2
+from psycopg2 import sql
+
+from fake_datasets import DEFAULT_CHUNK_SIZE, DEFAULT_SHARDS, TransactionShard, build_dataset, run_shards
+
+TABLES = {
+    "customers": [
+        ("id", "uuid"),
+        ("salutation", "text"),
+        ("first_name", "text"),
+        ("last_name", "text"),
+        ("email", "text"),
+        ("phone", "text"),
+        ("created_at", "timestamp"),
+        ("updated_at", "timestamp"),
+    ],
+    "products": [
+        ("id", "uuid"),
+        ("name", "text"),
+        ("brand", "text"),
+        ("category", "text"),
+        ("description", "text"),
+        ("price", "integer"),
+        ("created_at", "timestamp"),
+        ("updated_at", "timestamp"),
+    ],
+    "stores": [
+        ("id", "uuid"),
+        ("name", "text"),
+        ("address", "text"),
+        ("city", "text"),
+        ("postcode", "text"),
+        ("country", "text"),
+        ("created_at", "timestamp"),
+        ("updated_at", "timestamp"),
+    ],
+    "transactions": [
+        ("id", "uuid"),
+        ("customer_id", "uuid"),
+        ("product_id", "uuid"),
+        ("store_id", "uuid"),
+        ("transaction_date", "timestamp"),
+        ("amount", "numeric(10, 2)"),
+        ("currency", "char(3)"),
+        ("payment_method", "text"),
+        ("payment_status", "text"),
+        ("payment_reference", "uuid"),
+    ],
+}
+
+
+def connection_kwargs(sslmode: str | None = None) -> dict:
+    """Build psycopg2 connection arguments from the DBT_POSTGRES_* environment."""
+    return {
+        "host": os.environ["DBT_POSTGRES_HOST"],
+        "user": os.environ["DBT_POSTGRES_USER"],
+        "password": os.environ.get("DBT_POSTGRES_PASSWORD", ""),
+        "port": int(os.getenv("DBT_POSTGRES_PORT", 5432)),
+        "dbname": os.getenv("DBT_POSTGRES_DB", "neondb"),
+        "sslmode": sslmode or os.getenv("DBT_POSTGRES_SSLMODE", "require"),
+        "connect_timeout": 10,
+    }
+
+
+def create_tables(conn, schema: str) -> None:
+    """
+    Create the raw tables if missing, else empty them, without constraints so COPY doesn't maintain indexes.
+
+    Existing tables are truncated rather than dropped: the dbt stg_* views in
+    the same schema depend on them, and DROP ... CASCADE would take the views
+    with it.
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(sql.Identifier(schema)))
+        for table, columns in TABLES.items():
+            ident = sql.Identifier(schema, table)
+            cur.execute(
+                sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(
+                    ident,
+                    sql.SQL(", ").join(
+                        sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(type_))
+                        for name, type_ in columns
+                    ),
+                )
+            )
+            cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT IF EXISTS {}").format(
+                ident, sql.Identifier(f"{table}_pkey")
+            ))
+        cur.execute(sql.SQL("TRUNCATE {}").format(
+            sql.SQL(", ").join(sql.Identifier(schema, table) for table in TABLES)
+        ))
+    conn.commit()
+
+
+def copy_frame(cur, schema: str, table: str, df: pd.DataFrame) -> None:
+    """COPY one DataFrame into `schema.table` through an in-memory CSV buffer."""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    statement = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.Identifier(schema, table),
+        sql.SQL(", ").join(sql.Identifier(name) for name, _ in TABLES[table]),
+    )
+    cur.copy_expert(statement.as_string(cur), buf)
+
+
+def _copy_transaction_shard(shard: TransactionShard, chunk_size: int, conn_kwargs: dict, schema: str) -> int:
+    """Generate one shard of transactions and COPY it in. Runs in a worker process."""
+    rows = 0
+    with psycopg2.connect(**conn_kwargs) as conn:
+        with conn.cursor() as cur:
+            for chunk in shard.chunks(chunk_size):
+                copy_frame(cur, schema, "transactions", chunk)
+                rows += len(chunk)
+    conn.close()
+    return rows
+
+
+def finalize_tables(conn, schema: str) -> None:
+    """Add primary keys once the data is in, then refresh planner statistics."""
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        for table in TABLES:
+            ident = sql.Identifier(schema, table)
+            cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} PRIMARY KEY (id)").format(
+                ident, sql.Identifier(f"{table}_pkey")
+            ))
+            cur.execute(sql.SQL("ANALYZE {}").format(ident))
+
+
+def load_raw(
+    schema: str = "dev",
+    num_transactions: int | None = None,
+    scale: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    seed: int | None = None,
+    shards: int = DEFAULT_SHARDS,
+    workers: int | None = None,
+    end_date: date | None = None,
+    sslmode: str | None = None,
+):
+    """Generate the raw tables and bulk load them into `schema`, one connection per shard."""
+    conn_kwargs = connection_kwargs(sslmode)
+    dataset = build_dataset(num_transactions, scale, seed, shards, end_date)
+    timings = {}
+
+    started = time.perf_counter()
+    conn = psycopg2.connect(**conn_kwargs)
+    try:
+        create_tables(conn, schema)
+        with conn.cursor() as cur:
+            for table, df in dataset.dimensions.items():
+                copy_frame(cur, schema, table, df)
+        conn.commit()
+        timings["dimensions"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        rows = run_shards(_copy_transaction_shard, dataset.shards, workers, chunk_size, conn_kwargs, schema)
+        timings["transactions"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        finalize_tables(conn, schema)
+        timings["indexes_and_analyze"] = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    return {
+        **{table: len(df) for table, df in dataset.dimensions.items()},
+        "transactions": sum(rows),
+        "seed": dataset.seed,
+        "seconds": {k: round(v, 2) for k, v in timings.items()},
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate fake raw datasets and COPY them into Postgres.")
+    parser.add_argument("--schema", default="dev", help="Target schema for the raw tables (default: dev)")
+    parser.add_argument(
+        "--transactions", type=int, default=None,
+        help="Number of transactions to generate (default: random 100k-150k times --scale)",
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1,
+        help="Multiply customer and transaction volumes by this factor (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows per COPY batch (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Master seed for reproducible output (default: random)")
+    parser.add_argument(
+        "--shards", type=int, default=DEFAULT_SHARDS,
+        help=f"Number of transaction shards, each loaded on its own connection (default: {DEFAULT_SHARDS})",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--end-date", type=date.fromisoformat, default=None,
+        help="Last day of generated history, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--sslmode", default=None,
+        help="libpq sslmode, e.g. 'disable' for a local container (default: $DBT_POSTGRES_SSLMODE or 'require')",
+    )
+    args = parser.parse_args()
+    print(load_raw(
+        schema=args.schema,
+        num_transactions=args.transactions,
+        scale=args.scale,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        shards=args.shards,
+        workers=args.workers,
+        end_date=args.end_date,
+        sslmode=args.sslmode,
+    ))
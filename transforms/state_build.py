@@ -0,0 +1,176 @@
+"""
+Build only what changed, deferring everything else to production.
+
+Keeps the manifest.json (and run_results.json) of the last production build
+as saved state. A build then selects the nodes whose definition differs from
+that state, plus everything downstream of them (`state:modified+`), and
+builds only those with `--defer`, so refs to unchanged upstream models read
+the production relations instead of being rebuilt.
+
+    # after a production `dbt build`, keep its manifest and timings
+    python state_build.py save
+    # in CI or dev
+    python state_build.py build --target dev
+    python state_build.py build --target dev --dry-run     # just report the selection
+
+The selection and an estimate of the time saved (from the production
+timings in the saved run_results.json) are printed before building. With no
+saved state, the whole project is built.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from collections import deque
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent
+STATE_DIR = Path(os.getenv("DBT_STATE_DIR", PROJECT_DIR / "state" / "prod"))
+TARGET_DIR = PROJECT_DIR / "target"
+
+# Resource types `dbt build` runs
+BUILD_RESOURCE_TYPES = ("model", "seed", "snapshot", "test", "unit_test")
+
+
+def dbt_command(command: str, args) -> list[str]:
+    cmd = ["dbt", command, "--project-dir", str(PROJECT_DIR), "--profiles-dir", args.profiles_dir or str(PROJECT_DIR)]
+    if args.target:
+        cmd += ["--target", args.target]
+    return cmd
+
+
+def save_state(args) -> None:
+    """Copy the manifest (and timings) of a production build into the state directory."""
+    source = Path(args.source)
+    manifest = source / "manifest.json"
+    if not manifest.exists():
+        sys.exit(f"❌ {manifest} not found; run the production `dbt build` first")
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    for name in ("manifest.json", "run_results.json"):
+        if (source / name).exists():
+            shutil.copy2(source / name, STATE_DIR / name)
+    print(f"✓ Saved {manifest} as production state in {STATE_DIR}")
+
+
+def list_modified(args) -> list[str]:
+    """unique_ids dbt considers modified against the saved state (this also writes target/manifest.json)."""
+    cmd = dbt_command("ls", args) + [
+        "--select", "state:modified", "--state", str(STATE_DIR),
+        "--resource-types", *BUILD_RESOURCE_TYPES,
+        "--output", "json", "--output-keys", "unique_id", "--quiet",
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=PROJECT_DIR)
+    if proc.returncode != 0:
+        sys.exit(f"❌ dbt ls failed:\n{proc.stdout}{proc.stderr}")
+    return [json.loads(line)["unique_id"] for line in proc.stdout.splitlines() if line.startswith("{")]
+
+
+def downstream(manifest: dict, nodes: list[str]) -> set[str]:
+    """`nodes` and everything that depends on them, through the manifest's child_map."""
+    child_map = manifest.get("child_map", {})
+    seen = set(nodes)
+    queue = deque(nodes)
+    while queue:
+        for child in child_map.get(queue.popleft(), ()):
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+    return seen
+
+
+def buildable(manifest: dict) -> set[str]:
+    nodes = {**manifest.get("nodes", {}), **manifest.get("unit_tests", {})}
+    return {uid for uid, node in nodes.items() if node.get("resource_type") in BUILD_RESOURCE_TYPES}
+
+
+def production_timings(state_dir: Path) -> dict[str, float]:
+    run_results = state_dir / "run_results.json"
+    if not run_results.exists():
+        return {}
+    return {r["unique_id"]: r["execution_time"] for r in json.loads(run_results.read_text())["results"]}
+
+
+def print_selection(
+    manifest: dict, modified: list[str], selected: set[str], total: set[str], timings: dict[str, float]
+) -> None:
+    nodes = {**manifest.get("nodes", {}), **manifest.get("unit_tests", {})}
+    tests = [uid for uid in selected if nodes[uid]["resource_type"] in ("test", "unit_test")]
+    print(f"\n{'node':<48}{'type':<10}{'prod s':>9}  reason")
+    print("-" * 78)
+    for uid in sorted(set(selected) - set(tests), key=lambda u: (u not in modified, u)):
+        t = timings.get(uid)
+        seconds = f"{t:>9.2f}" if t is not None else f"{'new':>9}"
+        reason = "modified" if uid in modified else "downstream"
+        print(f"{nodes[uid]['name'][:47]:<48}{nodes[uid]['resource_type']:<10}{seconds}  {reason}")
+    if tests:
+        test_seconds = sum(timings.get(uid, 0.0) for uid in tests)
+        print(f"{f'+ {len(tests)} tests':<48}{'test':<10}{test_seconds:>9.2f}")
+
+    full = sum(timings.get(uid, 0.0) for uid in total)
+    rebuilt = sum(timings.get(uid, 0.0) for uid in selected)
+    # Tests attached to a changed model show up as modified too; count them on their own
+    built = set(selected) - set(tests)
+    changed = built & set(modified)
+    print(f"\n✓ {len(selected)} of {len(total)} nodes selected ({len(changed)} modified, "
+          f"{len(built) - len(changed)} downstream, {len(tests)} tests)")
+    if timings:
+        saved = full - rebuilt
+        share = f" ({saved / full:.0%})" if full else ""
+        print(f"⏱  estimated {rebuilt:.1f}s instead of {full:.1f}s for a full build, saving ~{saved:.1f}s{share}")
+        unknown = [uid for uid in selected if uid not in timings]
+        if unknown:
+            print(f"   {len(unknown)} selected node(s) have no production timing and are not counted")
+
+
+def build(args) -> int:
+    if not (STATE_DIR / "manifest.json").exists():
+        print(f"⚠️  No saved production state in {STATE_DIR}; building everything")
+        return subprocess.run(dbt_command("build", args), cwd=PROJECT_DIR).returncode
+
+    modified = list_modified(args)
+    if not modified:
+        print("✓ Nothing changed since the saved production state")
+        return 0
+    manifest = json.loads((TARGET_DIR / "manifest.json").read_text())
+    total = buildable(manifest)
+    selected = downstream(manifest, modified) & total
+    print_selection(manifest, modified, selected, total, production_timings(STATE_DIR))
+    if args.dry_run:
+        return 0
+
+    cmd = dbt_command("build", args) + ["--select", "state:modified+", "--defer", "--state", str(STATE_DIR)]
+    print(f"\n🔧 {' '.join(cmd)}")
+    return subprocess.run(cmd, cwd=PROJECT_DIR).returncode
+
+
+def main() -> None:
+    # dbt options, accepted before or after the subcommand. Their defaults are
+    # suppressed so a subcommand doesn't reset an option given before it.
+    dbt_options = argparse.ArgumentParser(add_help=False, argument_default=argparse.SUPPRESS)
+    dbt_options.add_argument("--target", help="dbt target (default: the profile's default)")
+    dbt_options.add_argument("--profiles-dir", help="dbt profiles directory (default: this project)")
+    parser = argparse.ArgumentParser(
+        description="Build only the nodes changed since the last production build.", parents=[dbt_options]
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    save = sub.add_parser(
+        "save", parents=[dbt_options], help="Save a production build's manifest as the state to compare against"
+    )
+    save.add_argument("--source", default=str(TARGET_DIR), help="Directory holding manifest.json (default: target/)")
+    run = sub.add_parser(
+        "build", parents=[dbt_options], help="Build state:modified+ with unchanged refs deferred to production"
+    )
+    run.add_argument("--dry-run", action="store_true", help="Report the selection without building")
+    args = parser.parse_args(namespace=argparse.Namespace(target=None, profiles_dir=None))
+
+    if args.command == "save":
+        save_state(args)
+    else:
+        sys.exit(build(args))
+
+
+if __name__ == "__main__":
+    main()